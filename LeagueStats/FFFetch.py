@@ -4,16 +4,31 @@
 #   10/27/2013                                                                #
 #                                                                             #
 #   Routine to pull arbitrary information from the ESPN fantasy               #
-#   football webpage.                                                         #
+#   football webpage.  Pages go through the shared on-disk HTTP cache         #
+#   (../httpcache.py), so re-runs only download what changed, as long as      #
+#   httpcache can be imported (the scripts here put the draft tools on the    #
+#   path when run); otherwise every page is downloaded.                       #
+#                                                                             #
+#   Pages are parsed by one of two backends: 'soup' (BeautifulSoup, the       #
+#   parse_soup_* methods) or 'lxml' (LxmlPage, which finds every table        #
+#   parse_soup knows about in one walk of the page).  Both give the same      #
+#   results; compare_parsers checks that on a saved page.                     #
 #                                                                             #
 ###############################################################################
 
 import collections
 import re
 
+import lxml.html
 from bs4 import BeautifulSoup
 from urllib import urlopen
 
+# the http cache is shared with the draft tools one directory up
+try:
+    from httpcache import HTTPCache
+except ImportError:
+    HTTPCache = None
+
 #-----------------------#
 #   Module Constants    #
 #-----------------------#
@@ -21,6 +36,10 @@ from urllib import urlopen
 LEAGUE_NAME = 'Sasquatch Nutz'
 LEAGUE_ID = 209006
 SEASON_ID = 2013
+PARSERS = ['soup', 'lxml']
+PARSER = 'lxml'
+
+PLAYER_ROW = re.compile('playerTableBgRow[01]')
 
 
 #-----------------------#
@@ -47,8 +66,15 @@ class FFFetcher():
 
     """
 
-    def __init__(self, leagueName=LEAGUE_NAME, leagueId=LEAGUE_ID, seasonId=SEASON_ID):
+    def __init__(self, leagueName=LEAGUE_NAME, leagueId=LEAGUE_ID, seasonId=SEASON_ID,
+                 httpCache=None, parser=PARSER):
         """Start me up"""
+        if parser not in PARSERS:
+            raise ValueError('parser {} not supported'.format(parser))
+        if httpCache is None and HTTPCache is not None:
+            httpCache = HTTPCache()
+        self.httpCache = httpCache
+        self.parser = parser
         self.URLDic = {}
         self.URLDic['leagueName'] = leagueName
         self.URLDic['leagueId'] = str(leagueId)
@@ -64,10 +90,36 @@ class FFFetcher():
             parseTag    -   given that url, what data are we looking for
      0 """
         url = self.fetch_url(urlTag, fmtDic)
-        soup = BeautifulSoup(urlopen(url))
+
+        if self.httpCache is not None:
+            body = self.httpCache.get(url).body
+        else:
+            body = urlopen(url).read()
 
         #
-        return self.parse_soup(soup, parseTag)
+        return self.parse_page(body, parseTag)
+
+    def parse_page(self, body, parseTag, parser=None):
+        """Parse the html body for parseTag with parser (by default, the
+        backend this fetcher was made with)
+
+        """
+        parser = parser or self.parser
+        if parser == 'soup':
+            return self.parse_soup(BeautifulSoup(body), parseTag)
+        elif parser == 'lxml':
+            return LxmlPage(body).parse(parseTag)
+        else:
+            raise ValueError('parser {} not supported'.format(parser))
+
+    def compare_parsers(self, body, parseTag):
+        """Parse the html body (a saved page, say) with both backends.
+        Returns (soup result, lxml result, whether they match)
+
+        """
+        fromSoup = self.parse_page(body, parseTag, 'soup')
+        fromLxml = self.parse_page(body, parseTag, 'lxml')
+        return fromSoup, fromLxml, fromSoup == fromLxml
 
     #---------------------------#
     #   URL fetchers            #
@@ -292,3 +344,202 @@ class FFFetcher():
             scores['{0:} {1:}'.format(week, pos)] = pts
 
         return scores
+
+
+#-----------------------#
+#   lxml Parsers        #
+#-----------------------#
+
+class LxmlPage():
+    """One page parsed with lxml.  A single walk of the games-fullcol div
+    finds every table parse_soup knows about (the first table, the
+    xstandTbl_div division tables, playertable_0 and the week's <em>); the
+    parse_* methods then only read their own table.  Their results are the
+    same as those of the matching FFFetcher.parse_soup_* methods.
+
+    """
+
+    def __init__(self, body):
+        self.root = lxml.html.fromstring(body)
+        self.fullcol = None
+        self.firstTable = None
+        self.divisionTables = {}
+        self.playerTable = None
+        self.em = None
+
+        for div in self.root.iter('div'):
+            if 'games-fullcol' in _classes(div):
+                self.fullcol = div
+                break
+        if self.fullcol is None:
+            # as soup's find_all("div", "games-fullcol")[0] would
+            raise IndexError('no games-fullcol div on this page')
+
+        for el in self.fullcol.iter('table', 'em'):
+            if el.tag == 'em':
+                if self.em is None:
+                    self.em = el
+                continue
+            if self.firstTable is None:
+                self.firstTable = el
+            tableId = el.get('id', '')
+            if tableId.startswith('xstandTbl_div'):
+                self.divisionTables.setdefault(tableId, el)
+            elif tableId == 'playertable_0' and self.playerTable is None:
+                self.playerTable = el
+
+    def parse(self, parseTag):
+        """The lxml twin of FFFetcher.parse_soup"""
+        if parseTag == 'seasonScores':
+            return self.parse_season_scores()
+        elif parseTag == 'seasonStandings':
+            return self.parse_season_standings()
+        elif parseTag == 'playerScores':
+            return self.parse_player_scores()
+        else:
+            raise ValueError('parseTag {} not supported'.format(parseTag))
+
+    def parse_season_scores(self):
+        """See FFFetcher.parse_soup_season_scores"""
+        retList = []
+
+        def parseTableRow(tr):
+
+            tds = list(tr.iter('td'))
+
+            away = str(_text(tds[0]))
+            home = str(_text(tds[3]))
+            away = away[: away.find('(') - 1]
+            home = home[: home.find('(') - 1]
+
+            score = str(_text(tds[5]))
+            try:
+                awayScore, homeScore = [float(el) for el in score.split('-')]
+            except ValueError as e:
+                if 'Box' in str(e):
+                    awayScore, homeScore = 'Box', 'Box'
+                elif 'Preview' in str(e):
+                    awayScore, homeScore = 'Preview', 'Preview'
+                else:
+                    raise e
+
+            return [home, away, homeScore, awayScore]
+
+        for tr in self.firstTable.iter('tr'):
+
+            #   Pull header rows
+            if tr.get('class') is not None:
+                if 'tableHead' in _classes(tr):
+                    currentWeek = _text(_first(tr, 'td'))
+            else:
+                #   Should be a schedule element
+                text = _text(tr)
+                if len(text) > 1:
+                    if 'Matchups' in text or 'Byes' in text:
+                        return retList
+                    else:
+                        apList = parseTableRow(tr)
+                        if 'Preview' not in apList:
+                            retList.append([currentWeek] + apList)
+
+        return retList
+
+    def parse_season_standings(self):
+        """See FFFetcher.parse_soup_season_standings; both tables come from
+        the one walk done in __init__
+
+        """
+        retDic = collections.defaultdict(dict)
+
+        for team, teamScores in self.parse_season_standings_scores().iteritems():
+            retDic[team]['PF'] = teamScores['PF']
+            retDic[team]['PA'] = teamScores['PA']
+
+        for team, teamStandings in self.parse_season_standings_standings().iteritems():
+            retDic[team]['WINS'] = teamStandings['WINS']
+            retDic[team]['LOSSES'] = teamStandings['LOSSES']
+            retDic[team]['TIES'] = teamStandings['TIES']
+
+        return retDic
+
+    def parse_season_standings_standings(self):
+        """See FFFetcher.parse_soup_season_standings_standings"""
+        standings = collections.defaultdict(dict)
+
+        for tr in _children(self.firstTable):
+            for td in _children(tr):
+                if _text(td) == u'\xa0':
+                    continue
+                for teamRow in _children(_first(td, 'table')):
+                    if _classes(teamRow) in [['tableHead'], ['tableSubHead']]:
+                        continue
+                    tds = list(teamRow.iter('td'))
+                    n = str(_text(tds[0]))
+                    standings[n]['WINS'] = int(_text(tds[1]))
+                    standings[n]['LOSSES'] = int(_text(tds[2]))
+                    standings[n]['TIES'] = int(_text(tds[3]))
+
+        return standings
+
+    def parse_season_standings_scores(self):
+        """See FFFetcher.parse_soup_season_standings_scores"""
+        scores = collections.defaultdict(dict)
+
+        for i in range(0, 4):
+            divisionTable = self.divisionTables['xstandTbl_div{}'.format(i)]
+            for teamRow in _children(divisionTable):
+                if _classes(teamRow) in [['tableHead'], ['tableSubHead']]:
+                    continue
+                tds = list(teamRow.iter('td'))
+                team = str(_text(_first(tds[0], 'a')))
+                scores[team]['PF'] = float(_text(tds[1]))
+                scores[team]['PA'] = float(_text(tds[2]))
+
+        return scores
+
+    def parse_player_scores(self):
+        """See FFFetcher.parse_soup_player_scores"""
+        scores = collections.defaultdict(dict)
+
+        # check for matchup
+        if 'Matchup not found' in _text(self.fullcol):
+            raise NoMatchup()
+
+        week = _text(self.em).upper()
+        week += ' - PLAYOFFS' if week.startswith('ROUND') else ''
+
+        scores['TEAM NAME'] = _text(_first(self.playerTable, 'tr')).replace(' Box Score', '')
+        if scores['TEAM NAME'] == 'BENCH':
+            raise ValueError('fuckit')
+
+        for teamRow in self.playerTable.iter('tr'):
+            # soup's class_=PLAYER_ROW: a search of the class attribute
+            if not PLAYER_ROW.search(teamRow.get('class', '')):
+                continue
+            tds = list(teamRow.iter('td'))
+            pos = str(_text(tds[0]))
+            pts = _text(tds[-1])
+            scores['{0:} {1:}'.format(week, pos)] = float(pts) if pts != '--' else 0
+
+        return scores
+
+
+def _text(el):
+    """All the text under el, as BeautifulSoup's .text has it"""
+    return unicode(el.text_content())
+
+
+def _classes(el):
+    return el.get('class', '').split()
+
+
+def _first(el, tag):
+    """The first descendant tag of el (soup's el.tag)"""
+    for child in el.iterdescendants(tag):
+        return child
+    return None
+
+
+def _children(el):
+    """The child elements of el (no comments)"""
+    return [child for child in el if isinstance(child.tag, basestring)]
@@ -14,6 +14,11 @@ import csv
 import itertools
 import os
 import scipy
+import sys
+
+if __name__ == '__main__':
+    # the shared http cache (httpcache.py) lives with the draft tools
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 
 import FFFetch
 
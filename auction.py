@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: auction.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    Auction drafts. Every team has a budget and a roster to fill, and every
+    free agent gets a dollar value: the minimum bid, plus a share of the
+    money left over (after a minimum bid for every open roster spot) in
+    proportion to his value over replacement.
+
+    Replacement is set by the open starting slots of the whole league. The
+    players who would fill them are found with the LineupSolver (the slots
+    of every team are one big lineup, so flex slots and players at several
+    positions are handled the same way as for a single team), and the
+    replacement level at a position is the best free agent there who would
+    not start. Only the top (number of open slots) free agents at each
+    position can start, so only those go through the solver; the values of
+    the whole pool are then a few array operations.
+
+    Sales are picks with a price; the price is kept in the pick log, so the
+    budgets come back with a resumed draft and an undone sale refunds it.
+    Values are re-solved after every pick and undo.
+
+Usage:
+    auction = AuctionDraft(dd, ffldraft.DRAFT_ORDER, budget=200)
+    auction.sell(dd.top_n(1, isFA=True), 'HPZ', 61)
+    auction.top(10)         # free agents by dollar value
+    auction.budgets['HPZ']  # {'spent', 'left', 'open', 'max_bid'}
+
+"""
+
+import numpy
+
+import zachlog
+
+from draftsim import ROUNDS
+from ffldraft import POS_LIST
+from lineup import LineupSolver, parse_slots
+from playertable import FA_CODE, POS_MASK
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+BUDGET = 200
+MIN_BID = 1
+
+logger = zachlog.getLogger(__name__)
+
+
+#---------------------------#
+#   Auction draft           #
+#---------------------------#
+
+class AuctionDraft():
+    """ Budgets, open roster spots and free agent dollar values of an
+        auction draft, kept up to date as players are sold
+
+    """
+    def __init__(self, draftData, teams, budget=BUDGET, rosterSize=ROUNDS,
+                 posList=None, minBid=MIN_BID):
+        self.draftData = draftData
+        self.table = draftData.table
+        self.teams = list(teams)
+        self.budget = budget
+        self.rosterSize = rosterSize
+        self.posList = posList or POS_LIST
+        self.minBid = minBid
+
+        self.refresh()
+        draftData.listeners.append(self.on_pick)
+
+    # Selling
+    def sell(self, players, teamName, price):
+        """ Sell players (player dicts) to teamName for price """
+        if teamName not in self.budgets:
+            raise ValueError("{} is not in this auction".format(teamName))
+        if self.budgets[teamName]['open'] < len(players):
+            raise ValueError("{} has no room for {} more".format(teamName, len(players)))
+        if price < self.minBid * len(players) or price > self.budgets[teamName]['max_bid']:
+            raise ValueError("{} can bid from {} to {}".format(
+                teamName, self.minBid * len(players), self.budgets[teamName]['max_bid']))
+        self.draftData.been_drafted(players, teamName, self.posList, price=price)
+
+    def sale_interactive(self, leagueTeams):
+        """ Take in a sale: who, to whom, and for how much """
+        players = self.draftData.get_player_interactive()
+        if not players:
+            return
+        teamId = self.draftData.get_team_interactive(leagueTeams)
+        if teamId is None:
+            return
+        teamName = leagueTeams[teamId][0]
+        while True:
+            try:
+                self.sell(players, teamName, int(raw_input('\nHow much? \t')))
+                break
+            except ValueError as e:
+                print "\t{}".format(e)
+
+    # Keeping up with the draft
+    def on_pick(self, players, teamName):
+        self.refresh()
+
+    def refresh(self):
+        """ Re-solve the budgets and every free agent's dollar value """
+        with self.draftData.timer.stage('auction'):
+            self.budgets = self.team_budgets()
+            self.values = self.dollar_values()
+
+    def prices(self):
+        """ Row: price paid, for every sale still standing (from the undo
+            stack of the pick log; the latest move of a player wins)
+
+        """
+        prices = {}
+        for event in self.draftData.log.stack:
+            price = float(event.get('price', 0)) / max(len(event['rows']), 1)
+            for row in event['rows']:
+                prices[row] = price
+        return prices
+
+    def team_budgets(self):
+        """ Team: {'spent', 'left', 'open', 'max_bid'}. The max bid leaves a
+            minimum bid for each of the team's other open spots
+
+        """
+        fteam = self.table['F TEAM']
+        rostered = numpy.flatnonzero(fteam != FA_CODE)
+        prices = self.prices()
+        paid = numpy.array([prices.get(row, 0.0) for row in rostered.tolist()])
+
+        nCodes = len(self.table.categories['F TEAM'])
+        count = numpy.bincount(fteam[rostered], minlength=nCodes)
+        spent = numpy.bincount(fteam[rostered], weights=paid, minlength=nCodes)
+
+        budgets = {}
+        for team in self.teams:
+            code = self.table.code('F TEAM', team)
+            s = spent[code] if code >= 0 else 0.0
+            n = count[code] if code >= 0 else 0
+            nOpen = max(self.rosterSize - n, 0)
+            left = self.budget - s
+            budgets[team] = {
+                'spent': s, 'left': left, 'open': nOpen,
+                'max_bid': left - (nOpen - 1) * self.minBid if nOpen else 0}
+        return budgets
+
+    # Dollar values
+    def open_slots(self):
+        """ The open starting slots of every team, as one list of slot
+            definitions (no more per team than it has open roster spots)
+
+        """
+        summary = self.draftData.team_draft_summary(self.posList, self.teams)
+        slots = []
+        for team in self.teams:
+            empty = [(name, positions) for (name, positions) in parse_slots(self.posList)
+                     if not summary[team].get(name)]
+            slots += empty[:self.budgets[team]['open']]
+        return slots
+
+    def dollar_values(self):
+        """ Every player's dollar value (nan for rostered players) """
+        values = numpy.full(len(self.table), numpy.nan)
+        fa = numpy.flatnonzero(self.table['F TEAM'] == FA_CODE)
+        nOpen = sum(b['open'] for b in self.budgets.values())
+        if not len(fa) or not nOpen:
+            values[fa] = 0.0
+            return values
+
+        slots = self.open_slots()
+        if not slots:
+            # every lineup is full; the rest is bench at the minimum bid
+            values[fa] = self.minBid
+            return values
+
+        pts = self.table['PTS'][fa].astype(float)
+        solver = LineupSolver(slots, self.table)
+        eligible = (solver.local(self.table[POS_MASK][fa])[:, None]
+                    >> numpy.arange(len(solver.positions)) & 1).astype(bool)
+
+        # who fills the open starting slots. Only the top len(slots) free
+        # agents at each position can (anyone below that at all of his
+        # positions could be swapped for someone better who is not in)
+        order = numpy.argsort(-pts, kind='mergesort')
+        candidates = numpy.unique(numpy.concatenate(
+            [order[eligible[order, i]][:len(slots)] for i in range(len(solver.positions))]
+            + [numpy.zeros(0, dtype=int)]))
+        starters = numpy.zeros(len(fa), dtype=bool)
+        if len(candidates):
+            starting = solver.solve(pts[candidates][None, :],
+                                    self.table[POS_MASK][fa[candidates]][None, :])[1][0]
+            starters[candidates[starting]] = True
+
+        # replacement level: the best free agent at a position not starting.
+        # Value over replacement is at a player's best position
+        left = numpy.where(eligible & ~starters[:, None], pts[:, None], -numpy.inf)
+        repl = numpy.maximum(left.max(axis=0), 0.0)
+        vor = numpy.where(eligible, pts[:, None] - repl[None, :], -numpy.inf).max(axis=1)
+        vor = numpy.maximum(vor, 0.0)
+
+        money = sum(b['left'] for b in self.budgets.values())
+        surplus = max(money - nOpen * self.minBid, 0.0)
+        total = vor[starters].sum()
+        dollars = self.minBid + (surplus / total * vor if total > 0 else numpy.zeros(len(fa)))
+
+        maxBid = max(b['max_bid'] for b in self.budgets.values())
+        values[fa] = numpy.clip(dollars, self.minBid, max(maxBid, self.minBid))
+        return values
+
+    # Queries
+    def top(self, N=None, pos=None):
+        """ The N free agents (at pos) worth the most, as player dicts with
+            their 'value' in dollars
+
+        """
+        rows = numpy.flatnonzero(self.table.mask(pos=pos, isFA=True))
+        rows = rows[numpy.argsort(-self.values[rows], kind='mergesort')][:N]
+        recs = self.table.records(rows)
+        for (rec, v) in zip(recs, self.values[rows]):
+            rec['value'] = v
+        return recs
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: benchmarks.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    Timings of the DraftData hot paths on synthetic leagues, so a pick
+    latency regression shows up before draft night rather than during it.
+
+    For every league size and player pool size a projection csv (same layout
+    as FFLDraftData.csv) and a snake draft picks file are generated from a
+    fixed seed, and then we time loading the data (parsing, and from the
+    binary cache), update_replacement_value, top_n, team_draft_summary for
+    every team, every pick of the draft end to end, and a full headless
+    replay of the picks file. Everything is offline and nothing is rendered.
+
+    A pick end to end is been_drafted plus the numbers a live draft works
+    out after it (best_replacement_available and draft_state, i.e. what
+    show_best_replacement_available and state_of_draft do short of drawing).
+    A headless been_drafted alone (moving the player and logging the pick)
+    is timed too.
+
+    Results can be saved as json and later runs compared against them; any
+    benchmark more than --tolerance slower than the baseline is reported and
+    the run exits non-zero.
+
+Usage:
+    python benchmarks.py                            # the full grid
+    python benchmarks.py -t 12 -n 700 -n 20000 --out bench.json
+    python benchmarks.py --baseline bench.json
+
+"""
+
+import argparse
+import csv
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from timeit import default_timer
+
+import numpy
+
+import ffldraft
+
+from draftsim import snake_order
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+TEAM_COUNTS = [10, 12, 16, 32]
+POOL_SIZES = [700, 2000, 5000, 20000]
+ROUNDS = 16
+REPEAT = 5
+SEED = 2014
+TOLERANCE = 0.25
+
+# roughly the position mix (and points scale) of FFLDraftData.csv
+POS_SHARE = [
+    ('QB', 0.15, 250.0),
+    ('RB', 0.24, 180.0),
+    ('WR', 0.32, 170.0),
+    ('TE', 0.17, 110.0),
+    ('D/ST', 0.045, 120.0),
+    ('K', 0.065, 130.0),
+    ('P', 0.01, 50.0),
+]
+NFL_TEAMS = ['Ari', 'Atl', 'Bal', 'Buf', 'Car', 'Chi', 'Cin', 'Cle', 'Dal',
+             'Den', 'Det', 'GB', 'Hou', 'Ind', 'Jax', 'KC', 'Mia', 'Min', 'NE',
+             'NO', 'NYG', 'NYJ', 'Oak', 'Phi', 'Pit', 'SD', 'SF', 'Sea', 'StL',
+             'TB', 'Ten', 'Was']
+CSV_HEADER = ['RNK', 'Player', 'Team Pos', 'F TEAM', 'C/A', 'YDS', 'TD', 'INT',
+              'RUSH', 'YDS', 'TD', 'REC', 'YDS', 'TD', 'PTS']
+
+
+#---------------------------#
+#   Synthetic data          #
+#---------------------------#
+
+def synthetic_csv(path, nPlayers, seed=SEED):
+    """ Write a projection csv of nPlayers made up players """
+    rng = numpy.random.RandomState(seed)
+    share = numpy.array([s for (p, s, scale) in POS_SHARE])
+    pos = rng.choice(len(POS_SHARE), nPlayers, p=share / share.sum())
+    scale = numpy.array([scale for (p, s, scale) in POS_SHARE])[pos]
+    pts = numpy.round(scale * rng.gamma(2.0, 0.5, nPlayers), 1)
+    team = rng.randint(len(NFL_TEAMS), size=nPlayers)
+    stats = rng.randint(0, 400, size=(nPlayers, 11))
+
+    with open(path, 'wb') as fOut:
+        csvOut = csv.writer(fOut)
+        csvOut.writerow(CSV_HEADER)
+        for (rnk, i) in enumerate(numpy.argsort(-pts, kind='mergesort')):
+            csvOut.writerow(
+                [rnk + 1, 'First{0} Last{0}'.format(i),
+                 '{} {}'.format(NFL_TEAMS[team[i]], POS_SHARE[pos[i]][0]), 'FA',
+                 '{}/{}'.format(stats[i, 0], stats[i, 1])]
+                + stats[i, 2:].tolist() + [pts[i]])
+
+
+def league(nTeams):
+    """ A LEAGUE_TEAMS style dict of nTeams made up teams """
+    return {i + 1: ['T{}'.format(i + 1), 'Team {}'.format(i + 1), 'Owner {}'.format(i + 1)]
+            for i in range(nTeams)}
+
+
+def synthetic_picks(path, dd, leagueTeams, rounds=ROUNDS, seed=SEED):
+    """ Write a snake draft picks file in which every team takes whoever has
+        the best noisy rank, and return the picks as (row, team label)
+
+    """
+    rng = numpy.random.RandomState(seed)
+    table = dd.table
+    noisy = table['RNK'] * numpy.exp(0.25 * rng.standard_normal(len(table)))
+    board = numpy.argsort(noisy, kind='mergesort')
+
+    teamOrder = [leagueTeams[k] for k in sorted(leagueTeams)]
+    order = snake_order(teamOrder, rounds)[:len(table)]
+
+    picks = []
+    with open(path, 'wb') as fOut:
+        csvOut = csv.writer(fOut)
+        csvOut.writerow(['playerpos', 'team'])
+        for (row, team) in zip(board, order):
+            p = table.record(row)
+            csvOut.writerow(['{} {} {}'.format(p['FIRST'], p['LAST'], p['POS']), team[1]])
+            picks.append((int(row), team[0]))
+    return picks
+
+
+#---------------------------#
+#   Timing                  #
+#---------------------------#
+
+def timed(f, repeat=REPEAT):
+    """ (min, median) seconds of repeat calls to f """
+    times = []
+    for i in range(repeat):
+        t0 = default_timer()
+        f()
+        times.append(default_timer() - t0)
+    return min(times), float(numpy.median(times))
+
+
+def bench_league(tmp, nTeams, nPlayers, repeat=REPEAT):
+    """ Every benchmark for one league size and player pool. Returns a dict
+        of name: (min, median) seconds
+
+    """
+    datafile = os.path.join(tmp, 'ffl_{}.csv'.format(nPlayers))
+    if not os.path.exists(datafile):
+        synthetic_csv(datafile, nPlayers)
+    fpicks = os.path.join(tmp, 'picks_{}_{}.csv'.format(nTeams, nPlayers))
+    leagueTeams = league(nTeams)
+
+    results = {}
+    dd = ffldraft.DraftData.headless(datafile)
+
+    def load(cache):
+        def f():
+            ffldraft._SHARED.clear()
+            dd.load_prediction_data(datafile, cache)
+        return f
+    results['load_prediction_data (csv)'] = timed(load(False), repeat)
+    results['load_prediction_data (cached)'] = timed(load(True), repeat)
+
+    # the draft, one been_drafted at a time, stopping half way through for
+    # the benchmarks of a draft in progress
+    ffldraft._SHARED.clear()
+    dd = ffldraft.DraftData.headless(datafile)
+    picks = synthetic_picks(fpicks, dd, leagueTeams)
+    teams = [v[0] for v in leagueTeams.values()]
+
+    latency = []
+    headless = []
+    for (i, (row, team)) in enumerate(picks):
+        if i == len(picks) // 2:
+            results['update_replacement_value'] = timed(dd.update_replacement_value, repeat)
+            results['top_n'] = timed(lambda: _top_n_mix(dd, teams[0]), repeat)
+            results['team_draft_summary'] = timed(
+                lambda: dd.team_draft_summary(ffldraft.POS_LIST, teams), repeat)
+
+        player = dd.table.record(row)
+        t0 = default_timer()
+        dd.been_drafted([player], team)
+        t1 = default_timer()
+        dd.best_replacement_available()
+        dd.draft_state(ffldraft.POS_LIST)
+        latency.append(default_timer() - t0)
+        headless.append(t1 - t0)
+
+    latency = numpy.array(latency)
+    results['pick end to end (median)'] = (numpy.median(latency),) * 2
+    results['pick end to end (p95)'] = (numpy.percentile(latency, 95),) * 2
+    results['pick end to end (max)'] = (latency.max(),) * 2
+    results['been_drafted headless (median)'] = (numpy.median(headless),) * 2
+
+    def replay():
+        dd.reset_draft()
+        dd.replay_draft_from_file(fpicks, leagueTeams)
+    results['replay_draft_from_file'] = timed(replay, max(1, repeat // 2))
+
+    return results
+
+
+def _top_n_mix(dd, team):
+    """ The top_n calls made around a pick """
+    dd.top_n(N=25, isFA=True)
+    for (pos, s, scale) in POS_SHARE:
+        dd.top_n(N=25, pos=pos, isFA=True)
+    dd.top_n(onTeam=team)
+
+
+#---------------------------#
+#   Main routine            #
+#---------------------------#
+
+def run(teamCounts=TEAM_COUNTS, poolSizes=POOL_SIZES, repeat=REPEAT):
+    """ The whole grid, as a dict of "teams/players/benchmark": (min, median)
+        seconds, printed as it goes
+
+    """
+    results = {}
+    tmp = tempfile.mkdtemp(prefix='fflbench')
+    try:
+        print '{:>5} {:>7}  {:<32} {:>10} {:>10}'.format(
+            'teams', 'players', 'benchmark', 'min ms', 'median ms')
+        for nPlayers in poolSizes:
+            for nTeams in teamCounts:
+                res = bench_league(tmp, nTeams, nPlayers, repeat)
+                for name in sorted(res):
+                    results['{}/{}/{}'.format(nTeams, nPlayers, name)] = res[name]
+                    print '{:>5} {:>7}  {:<32} {:>10.3f} {:>10.3f}'.format(
+                        nTeams, nPlayers, name, 1e3 * res[name][0], 1e3 * res[name][1])
+    finally:
+        shutil.rmtree(tmp)
+    return results
+
+
+def compare(results, baseline, tolerance=TOLERANCE):
+    """ The benchmarks whose median is more than tolerance slower than in
+        baseline, as (name, baseline, now) seconds
+
+    """
+    slower = []
+    for (name, (tMin, tMed)) in sorted(results.items()):
+        if name in baseline and tMed > (1.0 + tolerance) * baseline[name][1]:
+            slower.append((name, baseline[name][1], tMed))
+    return slower
+
+
+def _parse_args():
+    """ Grid, repeats, and where to save / compare results """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-t", "--teams", help="league sizes", type=int, action='append')
+    parser.add_argument("-n", "--players", help="player pool sizes", type=int, action='append')
+    parser.add_argument("-r", "--repeat", help="repeats per benchmark", type=int, default=REPEAT)
+    parser.add_argument("--out", help="save the results as json")
+    parser.add_argument("--baseline", help="json results to compare against")
+    parser.add_argument("--tolerance", help="allowed slowdown", type=float, default=TOLERANCE)
+
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == '__main__':
+
+    args = _parse_args()
+
+    results = run(args.teams or TEAM_COUNTS, args.players or POOL_SIZES, args.repeat)
+
+    if args.out:
+        with open(args.out, 'w') as fOut:
+            json.dump(results, fOut, indent=1, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as fIn:
+            slower = compare(results, json.load(fIn), args.tolerance)
+        for (name, then, now) in slower:
+            print 'SLOWER {}: {:.3f} ms -> {:.3f} ms'.format(name, 1e3 * then, 1e3 * now)
+        sys.exit(1 if slower else 0)
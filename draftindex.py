@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: draftindex.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    Ordered indexes over a PlayerTable which are maintained pick by pick, so
+    that a draft (or an un-draft) only touches the players next to the one
+    who moved rather than re-sorting the whole pool.
+
+    The order of every position depends only on the projections, so it lives
+    in a PositionOrder which any number of drafts on the same table can
+    share. A draft itself only keeps its fantasy team pools and the set of
+    rostered players, both of which grow with the picks; its free agents are
+    the shared order with the rostered players skipped.
+
+    A player eligible at several positions (playertable.POS_MASK) is in the
+    order, and in the pools, of every one of them; queries across positions
+    return him once.
+
+Usage:
+    pool = PoolIndex(table)                 # or PoolIndex(table, sharedOrder)
+    pool.move(row, 'HPZ')   # drafted
+    pool.move(row, 'FA')    # oops, roll it back
+    pool.top_n(10, pos='RB', isFA=True)
+
+"""
+
+from bisect import bisect_left, insort
+from heapq import merge
+from itertools import groupby, islice
+
+import numpy
+
+from collections import defaultdict
+
+from playertable import FA_CODE, POS_MASK
+
+
+#---------------------------#
+#   Shared position order   #
+#---------------------------#
+
+class PositionOrder():
+    """ For every position code, the (-PTS, row) keys of all the players
+        eligible there, sorted, and where each row sits in each list (-1 if
+        he is not in it). Ties fall back to row order exactly as
+        PlayerTable.draft_order does
+
+    """
+    def __init__(self, table):
+        pts = table['PTS']
+        masks = table[POS_MASK]
+        order = numpy.lexsort((numpy.arange(len(table)), -pts))
+
+        self.keys = {}
+        self.place = {}
+        for p in range(len(table.categories['POS'])):
+            rows = order[masks[order] >> p & 1 == 1]
+            if not len(rows):
+                continue
+            self.keys[p] = zip((-pts[rows]).tolist(), rows.tolist())
+            self.place[p] = numpy.full(len(table), -1, dtype=int)
+            self.place[p][rows] = numpy.arange(len(rows))
+
+
+class FreeAgents():
+    """ The free agents at one position of a PoolIndex, best first: a view of
+        the shared order which skips the rostered players
+
+    """
+    def __init__(self, index, posCode):
+        self.keys = index.order.keys.get(posCode, [])
+        self.rostered = index.rostered
+        self.size = len(self.keys) - index.nRostered[posCode]
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        rostered = self.rostered
+        for key in self.keys:
+            if key[1] not in rostered:
+                yield key
+
+    def after(self, place):
+        """ The first free agent below the place-th player of the order. The
+            walk only steps over rostered players, so it is never longer
+            than the number of picks made so far
+
+        """
+        rostered = self.rostered
+        for i in xrange(place + 1, len(self.keys)):
+            if self.keys[i][1] not in rostered:
+                return self.keys[i]
+        return None
+
+
+#---------------------------#
+#   Pool index              #
+#---------------------------#
+
+class PoolIndex():
+    """ Every (fantasy team, position) pool of the table, sorted by
+        descending points. Rostered pools are sorted lists of (-PTS, row)
+        keys; free agent pools are FreeAgents views of the shared order.
+
+        The replacement value of a player is the points lost by dropping to
+        the next player in his pool. It is worked out when asked for
+        (repl_val, replacement_curves) rather than stored per player and
+        kept up to date in move(): the views only ever ask for a few dozen
+        rows at a time, and each one costs a bisect of a small rostered pool
+        or a walk down the free agent order which can only step over
+        rostered players. A pick itself only bisects the pools of the player
+        who moved, and nothing is ever re-sorted
+
+    """
+    def __init__(self, table, order=None):
+        self.table = table
+        self.order = order or PositionOrder(table)
+        self.rebuild()
+
+    def rebuild(self):
+        """ Build the rostered pools from the F TEAM column """
+        fteam = self.table['F TEAM']
+
+        self.pools = defaultdict(list)
+        self.rostered = set()
+        self.nRostered = defaultdict(int)
+        drafted = numpy.flatnonzero(fteam != FA_CODE)
+        self.rostered.update(drafted.tolist())
+        for (row, p) in zip(*[x.tolist() for x in self.table.eligibility(drafted)]):
+            self.pools[fteam[row], p].append(self.key(row))
+            self.nRostered[p] += 1
+        for pool in self.pools.values():
+            pool.sort()
+
+    def key(self, row):
+        return (-self.table['PTS'][row], row)
+
+    def pools_of(self, row):
+        """ The (fteam code, pos code) of every pool the player at row is in """
+        f = self.table['F TEAM'][row]
+        return [(f, p) for p in self.table.positions(row)]
+
+    def move(self, row, teamName):
+        """ Move the player at row onto fantasy team teamName ('FA' to put him
+            back in the free agent pool)
+
+        """
+        row = int(row)
+        self.remove(row)
+        self.table.set_fteam(row, teamName)
+        self.insert(row)
+
+    def remove(self, row):
+        for (f, p) in self.pools_of(row):
+            if f == FA_CODE:
+                self.rostered.add(row)
+                self.nRostered[p] += 1
+            else:
+                pool = self.pools[f, p]
+                del pool[bisect_left(pool, self.key(row))]
+                if not pool:
+                    del self.pools[f, p]
+
+    def insert(self, row):
+        for (f, p) in self.pools_of(row):
+            if f == FA_CODE:
+                self.rostered.discard(row)
+                self.nRostered[p] -= 1
+            else:
+                insort(self.pools[f, p], self.key(row))
+
+    def free_agents(self, posCode):
+        """ The sorted (-PTS, row) keys of the free agents at posCode """
+        return FreeAgents(self, posCode)
+
+    def repl_val(self, rows):
+        """ The replacement value of every player in rows. A player in
+            several pools can be replaced from any of them, so it is the
+            smallest drop over his pools
+
+        """
+        replVal = numpy.zeros(len(rows))
+        for (i, row) in enumerate(rows):
+            key = self.key(row)
+            drops = []
+            for (f, p) in self.pools_of(row):
+                if f == FA_CODE:
+                    below = self.free_agents(p).after(self.order.place[p][row])
+                else:
+                    pool = self.pools[f, p]
+                    j = bisect_left(pool, key) + 1
+                    below = pool[j] if j < len(pool) else None
+                drops.append(key[0] - below[0] if below is not None else 0.0)
+            replVal[i] = max(drops)
+        return replVal
+
+    # Queries
+    def pools_matching(self, pos=None, isFA=None, onTeam=None):
+        """ Yield ((fteam code, pos code), pool) for every non-empty pool which
+            satisfies the filters of top_n
+
+        """
+        posCode = None if pos is None else self.table.code('POS', pos)
+        teamCode = None if onTeam is None else self.table.code('F TEAM', onTeam)
+
+        if isFA in (None, True) and teamCode in (None, FA_CODE):
+            for p in self.order.keys:
+                if posCode is None or p == posCode:
+                    pool = self.free_agents(p)
+                    if pool:
+                        yield ((FA_CODE, p), pool)
+
+        if isFA in (None, False):
+            for ((f, p), pool) in self.pools.items():
+                if (pool
+                        and (posCode is None or p == posCode)
+                        and (teamCode is None or f == teamCode)):
+                    yield ((f, p), pool)
+
+    def top_n(self, N=None, pos=None, isFA=None, onTeam=None):
+        """ Rows of the top N players (by points) which satisfy the filters.
+            Only the matching pools are read, and only as far as N. Players
+            in more than one matching pool are counted once
+
+        """
+        pools = [pool for (k, pool) in self.pools_matching(pos, isFA, onTeam)]
+        return _merge_rows(pools, N)
+
+    def top_n_by_position(self, N=None, isFA=None, onTeam=None):
+        """ top_n for every position at once: a dict of position label to the
+            rows of the top N players there
+
+        """
+        byPos = defaultdict(list)
+        for ((f, p), pool) in self.pools_matching(None, isFA, onTeam):
+            byPos[p].append(pool)
+
+        return {self.table.label('POS', p): _merge_rows(pools, N)
+                for (p, pools) in byPos.items()}
+
+    def replacement_curves(self, N=None, pos=None, inclusive=True):
+        """ Cumulative replacement value curves for the top N free agents at
+            every position (or only at pos). Returns a dict of position:
+            (rows, curve) arrays, where curve[i] is the points given up by
+            waiting i + 1 picks at that position (i picks if not inclusive).
+
+            The replacement values are the point drops down the top N + 1, and
+            all positions are stacked into one padded array so the prefix
+            sums are a single cumsum
+
+        """
+        M = N + 1 if N else None
+        if pos is None:
+            byPos = self.top_n_by_position(M, isFA=True)
+        else:
+            byPos = {pos: self.top_n(M, pos, isFA=True)}
+
+        positions = sorted(p for (p, rows) in byPos.items() if rows)
+        if not positions:
+            return {}
+
+        pts = self.table['PTS']
+        drops = {}
+        for p in positions:
+            drops[p] = numpy.append(numpy.diff(pts[byPos[p]]), 0.0)[:N]
+            byPos[p] = byPos[p][:N]
+
+        lengths = numpy.array([len(byPos[p]) for p in positions])
+        valid = numpy.arange(lengths.max()) < lengths[:, None]
+        rows = numpy.zeros(valid.shape, dtype=int)
+        rows[valid] = numpy.concatenate([byPos[p] for p in positions])
+        replVal = numpy.zeros(valid.shape)
+        replVal[valid] = numpy.concatenate([drops[p] for p in positions])
+
+        curves = numpy.cumsum(replVal, axis=1)
+        if not inclusive:
+            curves = numpy.hstack([numpy.zeros((len(positions), 1)), curves[:, :-1]])
+
+        return {p: (rows[i, :lengths[i]], curves[i, :lengths[i]])
+                for (i, p) in enumerate(positions)}
+
+
+def _merge_rows(pools, N=None):
+    """ Merge already sorted pools and return the rows of the first N.
+        Equal keys come out of the merge next to each other, so a player in
+        several pools is dropped after the first time
+
+    """
+    if len(pools) == 1:
+        keys = pools[0]
+    else:
+        keys = (k for (k, g) in groupby(merge(*pools)))
+    return [row for (negPts, row) in islice(keys, N)]
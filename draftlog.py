@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: draftlog.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    An append-only log of draft events, so the state of a live draft lives
+    somewhere other than the player table in memory. Every pick is written
+    (and fsync'd) as one json line recording who moved, where from and where
+    to; an undo is just another line, and is applied as the inverse move
+    through the pool index. A reset (everyone back in the pool) is a line
+    too, followed at once by a snapshot. Every so often a compact snapshot
+    (the drafted rows and the undo stack) is written next to the log, so
+    restarting only has to read the snapshot and the few lines after it.
+
+Usage:
+    dd = ffldraft.DraftData(logfile='draft_2014.log')    # resumes if it exists
+    dd.undo_last_pick()
+
+"""
+
+import json
+import os
+
+import zachlog
+
+from playertable import FA_CODE
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+SNAPSHOT_EVERY = 25
+
+logger = zachlog.getLogger(__name__)
+
+
+#---------------------------#
+#   Draft log               #
+#---------------------------#
+
+class DraftLog():
+    """ Append-only pick / undo log with periodic snapshots. With path=None
+        the log is kept in memory only (undo still works, recovery does not)
+
+    """
+    def __init__(self, path=None, snapshotEvery=SNAPSHOT_EVERY):
+        self.path = path
+        self.snapPath = path + '.snap' if path else None
+        self.snapshotEvery = snapshotEvery
+        self.seq = 0
+        self.stack = []
+        self.sinceSnapshot = 0
+        self.fOut = None
+
+    # Recovery
+    def restore(self, draftData):
+        """ Bring draftData up to the state in the snapshot plus log tail, and
+            open the log for appending
+
+        """
+        if not self.path:
+            return
+
+        snapSeq = 0
+        if os.path.exists(self.snapPath):
+            with open(self.snapPath, 'r') as fIn:
+                snap = json.load(fIn)
+            if snap['nRows'] != len(draftData.table):
+                raise ValueError("{} was written against a different player table".format(self.snapPath))
+            self._load_snapshot(draftData, snap)
+            snapSeq = snap['seq']
+
+        tail = 0
+        line = '\n'
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as fIn:
+                for line in fIn:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        # a line cut short by the crash we are recovering from
+                        logger.warning("skipping unreadable log line {!r}".format(line))
+                        continue
+                    if event['seq'] > snapSeq:
+                        self._replay(draftData, event)
+                        tail += 1
+                    self.seq = max(self.seq, event['seq'])
+
+        self.sinceSnapshot = tail
+        logger.info("restored draft at event {} ({} events after the snapshot)".format(self.seq, tail))
+        self.fOut = open(self.path, 'a')
+        if not line.endswith('\n'):
+            self.fOut.write('\n')
+
+    def _load_snapshot(self, draftData, snap):
+        table = draftData.table
+        table['F TEAM'][:] = FA_CODE
+        for (row, teamName) in snap['drafted']:
+            table.set_fteam(row, teamName)
+        draftData.pool.rebuild()
+
+        self.seq = snap['seq']
+        self.stack = snap['stack']
+
+    def _replay(self, draftData, event):
+        if event['op'] == 'pick':
+            for row in event['rows']:
+                draftData.pool.move(row, event['to'])
+            self.stack.append(event)
+        elif event['op'] == 'undo':
+            undone = self.stack.pop()
+            for (row, teamName) in zip(undone['rows'], undone['from']):
+                draftData.pool.move(row, teamName)
+        elif event['op'] == 'reset':
+            draftData.table['F TEAM'][:] = FA_CODE
+            draftData.pool.rebuild()
+            self.stack = []
+
+    # Recording
+    def record_pick(self, draftData, rows, previous, teamName, price=None):
+        event = {'op': 'pick', 'rows': [int(r) for r in rows], 'from': previous,
+                 'to': teamName}
+        if price is not None:
+            event['price'] = price
+        self.stack.append(event)
+        self._append(draftData, event)
+        return event
+
+    def record_undo(self, draftData):
+        """ Log an undo of the last pick and return that pick (or None if
+            there is nothing to undo). Applying the inverse is up to the caller
+
+        """
+        if not self.stack:
+            return None
+        undone = self.stack.pop()
+        self._append(draftData, {'op': 'undo', 'undoes': undone['seq']})
+        return undone
+
+    def record_reset(self, draftData):
+        """ Log that every player went back to the pool (nothing before it
+            can be undone), and snapshot straight away so a restart does not
+            replay the picks before the reset
+
+        """
+        self.stack = []
+        self._append(draftData, {'op': 'reset'})
+        self.snapshot(draftData)
+
+    def _append(self, draftData, event):
+        self.seq += 1
+        event['seq'] = self.seq
+        if self.fOut:
+            self.fOut.write(json.dumps(event) + '\n')
+            self.fOut.flush()
+            os.fsync(self.fOut.fileno())
+
+            self.sinceSnapshot += 1
+            if self.sinceSnapshot >= self.snapshotEvery:
+                self.snapshot(draftData)
+
+    def snapshot(self, draftData):
+        """ Atomically write the drafted rows and undo stack as of now """
+        if not self.snapPath:
+            return
+
+        table = draftData.table
+        fteam = table['F TEAM']
+        drafted = [[int(row), table.label('F TEAM', fteam[row])]
+                   for row in (fteam != FA_CODE).nonzero()[0]]
+        snap = {'seq': self.seq, 'nRows': len(table), 'drafted': drafted,
+                'stack': self.stack}
+
+        tmp = self.snapPath + '.tmp'
+        with open(tmp, 'w') as fOut:
+            json.dump(snap, fOut)
+            fOut.flush()
+            os.fsync(fOut.fileno())
+        os.rename(tmp, self.snapPath)
+        self.sinceSnapshot = 0
+
+    def close(self):
+        if self.fOut:
+            self.fOut.close()
+            self.fOut = None
@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: draftplots.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    Persistent live-draft figures. Instead of clf()-ing and rebuilding every
+    subplot after each pick, these keep their lines and bars around, change
+    only the data that moved, and blit the touched axes. A full redraw only
+    happens when the layout, legend or y-limits change.
+
+Usage:
+    replPlot = ReplacementPlot(pylab.figure(1))
+    replPlot.update(curves, labels, N=25)
+    replPlot.flush()
+
+"""
+
+import numpy
+
+from math import ceil, floor
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+POS_COLOR = {
+    'K': 'm',
+    'P': 'y',
+    'QB': 'k',
+    'WR': 'b',
+    'RB': 'r',
+    'TE': 'g',
+    'D/ST': 'c',
+}
+
+YLIM_STEP = 100.0
+
+
+#---------------------------#
+#   Blitting base           #
+#---------------------------#
+
+class BlitFigure():
+    """ Wrap a figure whose data artists are animated. After every full draw
+        the clean axes backgrounds are cached; afterwards an update only
+        restores the background of the axes that changed, redraws their
+        animated artists and blits them. Changes are collected until flush(),
+        so several updates cost one redraw
+
+    """
+    def __init__(self, fig):
+        self.fig = fig
+        self.canvas = fig.canvas
+        self.backgrounds = {}
+        self.dirty = set()
+        self.stale = True
+        self.shown = False
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+
+    def animated(self, ax):
+        """ The animated artists living on ax """
+        return []
+
+    def _on_draw(self, event):
+        if hasattr(self.canvas, 'copy_from_bbox'):
+            self.backgrounds = {ax: self.canvas.copy_from_bbox(ax.bbox)
+                                for ax in self.fig.axes}
+        for ax in self.fig.axes:
+            self._draw_animated(ax)
+
+    def _draw_animated(self, ax):
+        for artist in self.animated(ax):
+            ax.draw_artist(artist)
+
+    def mark(self, ax):
+        self.dirty.add(ax)
+
+    def flush(self):
+        """ Push all pending changes to the screen: a full (idle) draw if the
+            figure is stale, otherwise a blit of the dirty axes
+
+        """
+        if self.stale or not self.backgrounds:
+            self.canvas.draw_idle()
+            if not self.shown:
+                self.fig.show()
+                self.shown = True
+        else:
+            for ax in self.dirty:
+                self.canvas.restore_region(self.backgrounds[ax])
+                self._draw_animated(ax)
+                self.canvas.blit(ax.bbox)
+            self.canvas.flush_events()
+
+        self.stale = False
+        self.dirty.clear()
+
+
+#---------------------------#
+#   Replacement curves      #
+#---------------------------#
+
+class ReplacementPlot(BlitFigure):
+    """ One line per position showing the cumulative replacement value of
+        waiting at that position
+
+    """
+    def __init__(self, fig, ylim=(-200, 0)):
+        BlitFigure.__init__(self, fig)
+        self.ylim = ylim
+        self.ax = None
+        self.legend = None
+        self.lines = {}
+        self.curves = {}
+        self.labels = {}
+        self.N = None
+
+    def animated(self, ax):
+        return self.lines.values() + ([self.legend] if self.legend else [])
+
+    def _build(self, positions, N):
+        self.fig.clf()
+        self.ax = self.fig.add_subplot(111)
+        self.legend = None
+        self.lines = {}
+        self.curves = {}
+        self.labels = {}
+        for pos in positions:
+            c = POS_COLOR.get(pos, 'k')
+            self.lines[pos], = self.ax.plot([], [], color=c, marker='o', mfc='w',
+                                            mec=c, mew=2, lw=2, animated=True)
+        self.ax.set_ylim(self.ylim)
+        self.ax.set_xlim((-0.5, N - 0.5))
+        self.N = N
+        self.stale = True
+
+    def update(self, curves, labels, N):
+        """ curves is a dict of position: curve array, labels a dict of
+            position: legend label
+
+        """
+        if set(curves) != set(self.lines) or N != self.N:
+            self._build(sorted(curves), N)
+
+        for (pos, curve) in curves.items():
+            if not numpy.array_equal(curve, self.curves.get(pos)):
+                self.lines[pos].set_data(numpy.arange(len(curve)), curve)
+                self.curves[pos] = curve
+                self.mark(self.ax)
+
+        if labels != self.labels:
+            for (pos, lab) in labels.items():
+                self.lines[pos].set_label(lab)
+            self.legend = self.ax.legend(loc='lower left', fontsize=10)
+            self.legend.set_animated(True)
+            self.labels = dict(labels)
+            self.mark(self.ax)
+
+
+#---------------------------#
+#   Team panels             #
+#---------------------------#
+
+class DraftStatePlot(BlitFigure):
+    """ One bar panel per fantasy team showing points above / below the
+        league average at every starting slot, flex spot, and in total
+
+    """
+    def __init__(self, fig, width=0.4):
+        BlitFigure.__init__(self, fig)
+        self.width = width
+        self.layout = None
+        self.axes = {}
+        self.bars = {}
+        self.heights = {}
+        self.ylim = None
+
+    def animated(self, ax):
+        return self.bars.get(ax, [])
+
+    def _build(self, teams, posList, flexKeys):
+        posListSpec = posList + flexKeys + ['TOTAL']
+        N = len(teams)
+        J = floor(N ** .5)
+        I = ceil(N / float(J))
+
+        self.fig.clf()
+        self.fig.subplots_adjust(left=0.04, bottom=0.06, right=0.98, top=0.95)
+
+        lefts = numpy.arange(len(posListSpec))
+        alphas = [0.75] * len(posList) + [0.35] * len(flexKeys) + [1.0]
+        self.axes = {}
+        self.bars = {}
+        self.heights = {}
+        for (i, team) in enumerate(teams):
+            sNow = self.fig.add_subplot(I, J, i + 1)
+            bars = sNow.bar(lefts, numpy.zeros(len(posListSpec)),
+                            width=self.width, color='blue', align='edge',
+                            animated=True)
+            for (rect, alpha) in zip(bars, alphas):
+                rect.set_alpha(alpha)
+            bars[-1].set_color('red')
+
+            sNow.set_title(team)
+            sNow.set_xticks(lefts + self.width)
+            sNow.set_xticklabels(posListSpec, fontsize=8)
+
+            self.axes[team] = sNow
+            self.bars[sNow] = list(bars)
+            self.heights[team] = numpy.zeros(len(posListSpec))
+
+        self.layout = (teams, posListSpec)
+        self.ylim = None
+        self.stale = True
+
+    def update(self, teams, posList, flexKeys, binVals):
+        """ binVals is a dict of team: {slot: pts above average} """
+        posListSpec = posList + flexKeys + ['TOTAL']
+        if (teams, posListSpec) != self.layout:
+            self._build(teams, posList, flexKeys)
+
+        for team in teams:
+            heights = numpy.array([binVals[team].get(pos, 0.0) for pos in posListSpec])
+            changed = numpy.flatnonzero(heights != self.heights[team])
+            if not len(changed):
+                continue
+
+            ax = self.axes[team]
+            bars = self.bars[ax]
+            for i in changed:
+                bars[i].set_height(heights[i])
+            bars[-1].set_color('green' if heights[-1] > 0 else 'red')
+            self.heights[team] = heights
+            self.mark(ax)
+
+        # the y-limits are shared, ignore the flex slots, and are rounded out
+        # to YLIM_STEP so that they (and the full redraw) rarely change
+        nonFlex = [binVals[team].get(pos, 0.0) for team in teams
+                   for pos in posList + ['TOTAL']]
+        ylim = (YLIM_STEP * floor(min(nonFlex) / YLIM_STEP),
+                YLIM_STEP * ceil(max(nonFlex) / YLIM_STEP))
+        if ylim != self.ylim and ylim[0] < ylim[1]:
+            for ax in self.axes.values():
+                ax.set_ylim(ylim)
+            self.ylim = ylim
+            self.stale = True
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: draftreplay.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    Replay a finished draft (a picks csv like the one simulate_draft_from_file
+    reads) against a headless DraftData without any plotting or prompts, and
+    collect per-pick metrics as arrays so that archived drafts can be graded
+    in bulk
+
+Usage:
+    dd = ffldraft.DraftData(render=False)
+    metrics = dd.replay_draft_from_file('draft_2014.csv')
+    metrics['vor']          # value over replacement of every pick
+
+"""
+
+import csv
+
+import numpy
+
+import zachlog
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+logger = zachlog.getLogger(__name__)
+
+
+#---------------------------#
+#   Reading picks           #
+#---------------------------#
+
+def read_picks(fpicks):
+    """ Parse a picks csv into a list of (first, last, pos, team name)
+        tuples. The playerpos column looks like "First Last POS"
+
+    """
+    with open(fpicks, 'r') as fIn:
+        draft = list(csv.DictReader(fIn))
+
+    picks = []
+    for d in draft:
+        flpos = d['playerpos'].split(' ')
+        picks.append((flpos[0], ' '.join(flpos[1:-1]), flpos[-1], d['team']))
+
+    return picks
+
+
+def team_labels(leagueTeams):
+    """ Map full team names (as they appear in picks files) to the short
+        F TEAM labels used in the player table
+
+    """
+    return {v[1]: v[0] for v in leagueTeams.values()}
+
+
+#---------------------------#
+#   Replay                  #
+#---------------------------#
+
+def replay_draft(draftData, picks, teamNames=None, posList=None, N=25):
+    """ Apply every pick in picks to draftData and return a dict of per-pick
+        metric arrays:
+
+            row         player table row of the pick (-1 if not found)
+            team        F TEAM label of the drafting team
+            PTS         projected points of the pick
+            vor         PTS over the best free agent left at his position
+            positions   position labels, in the order used by curves
+            curves      (picks x positions x N) cumulative replacement curves
+                        after each pick, NaN padded
+            teams       team labels, in the order used by summary
+            slots       starting slots, in the order used by summary
+            summary     (picks x teams x slots) starter points after each pick
+
+        Nothing is plotted, and unknown players are skipped (and logged)
+        rather than prompted for. Names are resolved to one player each as
+        in a live draft (see DraftData.find_player), and every pick goes
+        through been_drafted, so it is written to the draft log (and can be
+        undone) and any listeners keep up
+
+    """
+    table = draftData.table
+    teamNames = teamNames or {}
+    posList = posList or []
+
+    nPicks = len(picks)
+    labels = [teamNames.get(team, team) for (first, last, pos, team) in picks]
+    teams = sorted(set(labels))
+    teamIndex = {team: i for (i, team) in enumerate(teams)}
+    # every position anyone is eligible at, not only the first listed
+    positions = sorted(table.categories['POS'].labels)
+    posIndex = {pos: i for (i, pos) in enumerate(positions)}
+
+    metrics = {
+        'row': numpy.full(nPicks, -1, dtype=int),
+        'team': numpy.array(labels, dtype=object),
+        'PTS': numpy.full(nPicks, numpy.nan),
+        'vor': numpy.full(nPicks, numpy.nan),
+        'positions': positions,
+        'curves': numpy.full((nPicks, len(positions), N), numpy.nan),
+        'teams': teams,
+        'slots': posList,
+        'summary': numpy.zeros((nPicks, len(teams), len(posList))),
+    }
+
+    curves = _curve_array(draftData, posIndex, N)
+    summary = metrics['summary']
+    # been_drafted would redraw the plots after every pick
+    render, draftData.render = draftData.render, False
+    try:
+        for (i, (first, last, pos, team)) in enumerate(picks):
+            row = draftData.find_player(first, last, pos)
+            teamName = labels[i]
+
+            if i:
+                summary[i] = summary[i - 1]
+
+            if row is None:
+                logger.warning("pick {}: no player named {} {}".format(i + 1, first, last))
+                metrics['curves'][i] = curves
+                continue
+
+            draftData.been_drafted([table.record(row)], teamName, posList)
+
+            pts = table['PTS'][row]
+            fa = next(iter(draftData.pool.free_agents(table['POS'][row])), None)
+            metrics['row'][i] = row
+            metrics['PTS'][i] = pts
+            metrics['vor'][i] = pts + fa[0] if fa else pts
+
+            # only the drafting team's lineup can have changed
+            tds = draftData.team_draft_summary(posList, [teamName])[teamName]
+            summary[i, teamIndex[teamName]] = [tds[pos].get('PTS', 0.0) for pos in posList]
+
+            curves = _curve_array(draftData, posIndex, N)
+            metrics['curves'][i] = curves
+    finally:
+        draftData.render = render
+
+    return metrics
+
+
+def _curve_array(draftData, posIndex, N):
+    """ The current replacement curves as one (positions x N) array """
+    curves = numpy.full((len(posIndex), N), numpy.nan)
+    for (pos, (rows, curve)) in draftData.pool.replacement_curves(N=N).items():
+        curves[posIndex[pos], :len(curve)] = curve
+    return curves
@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: draftserver.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    A small HTTP server around a DraftData, so the whole league can follow
+    (and feed) the live draft instead of one person at the raw_input prompts.
+
+    Everything a client shows is kept as a flat dict of views (the best free
+    agents at each position, the replacement curve at each position, every
+    team's lineup, and in an auction the best dollar values and budgets). A
+    pick only recomputes the views it can touch and records, under a new
+    version number, the ones which actually changed. Clients long-poll for
+    the changes since the version they have and get a small json delta
+    back. (No asyncio or websockets in python 2, so it is threads and long
+    polling.)
+
+    Requests are served from a thread per connection; picks and reads of
+    the views share one lock, and pollers sleep on it until the next pick.
+
+Usage:
+    python draftserver.py --port 8000 --logfile draft_2014.log
+    python draftserver.py --budget 200      # an auction
+
+    GET  /state                     every view, and the current version
+    GET  /updates?since=12          views changed since version 12 (waits
+                                    up to ?timeout= seconds for a change)
+    POST /pick  {"row": 17, "team": "HPZ"}
+                {"first": "Jamaal", "last": "Charles", "team": "HPZ"}
+                {"first": "Ryan", "last": "Griffin", "pos": "TE", "team": "CL"}
+                {"row": 17, "team": "HPZ", "price": 54}      (auctions)
+                {"row": 17, "team": "FA"}                    (back to the pool)
+    POST /undo
+
+"""
+
+import argparse
+import json
+import threading
+import time
+
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+from collections import deque
+from urlparse import parse_qs, urlparse
+
+import zachlog
+
+import ffldraft
+
+from auction import AuctionDraft
+from playertable import FA_CODE
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+PORT = 8000
+N_CURVE = 25
+N_BEST = 10
+HISTORY = 500
+POLL_TIMEOUT = 25.0
+
+logger = zachlog.getLogger(__name__)
+
+
+#---------------------------#
+#   Versioned views         #
+#---------------------------#
+
+class DraftFeed():
+    """ The client-facing views of a DraftData, and the deltas between
+        versions of them. Create it after any other listeners (e.g. a
+        LookaheadService) so that they are up to date when it looks
+
+    """
+    def __init__(self, draftData, posList=ffldraft.POS_LIST, N=N_CURVE,
+                 nBest=N_BEST, lookahead=None, auction=None, history=HISTORY):
+        self.draftData = draftData
+        self.table = draftData.table
+        self.posList = posList
+        self.N = N
+        self.nBest = nBest
+        self.lookahead = lookahead
+        self.auction = auction
+
+        self.cond = threading.Condition()
+        self.version = 0
+        self.views = {}
+        self.history = deque(maxlen=history)
+        with self.cond:
+            self._apply(self.compute(self.teams()))
+
+        draftData.listeners.append(self.on_pick)
+
+    # Building views
+    def teams(self):
+        return self.table.labels_in_use('F TEAM', self.table['F TEAM'] != FA_CODE)
+
+    def compute(self, teams):
+        """ Fresh values of the position views and of the lineup views of
+            teams
+
+        """
+        views = {}
+        pool = self.draftData.pool
+        for (pos, rows) in pool.top_n_by_position(self.nBest, isFA=True).items():
+            views['best/' + pos] = self.players(rows)
+        for (pos, (rows, curve)) in pool.replacement_curves(N=self.N).items():
+            views['curve/' + pos] = [round(float(x), 1) for x in curve]
+        if self.lookahead:
+            views['wait'] = self.players(self.lookahead.rows[:self.nBest],
+                                         wait_loss=self.lookahead.waitLoss)
+        if self.auction:
+            rows = [p[ffldraft.IDX] for p in self.auction.top(self.nBest)]
+            views['values'] = self.players(rows, value=self.auction.values[rows])
+            views['budgets'] = {team: {k: round(float(v), 2) for (k, v) in b.items()}
+                                for (team, b) in self.auction.budgets.items()}
+
+        summary = self.draftData.team_draft_summary(self.posList, teams)
+        for team in teams:
+            views['team/' + team] = {
+                slot: [p[ffldraft.IDX], self.name(p), self.positions(p), p['PTS']] if p else None
+                for (slot, p) in summary[team].items()}
+        return views
+
+    def players(self, rows, **extra):
+        """ The compact json form of a list of players """
+        out = []
+        replVal = self.draftData.pool.repl_val(rows)
+        for (i, p) in enumerate(self.table.records(rows)):
+            player = {'row': p[ffldraft.IDX], 'name': self.name(p), 'POS': self.positions(p),
+                      'TEAM': p['TEAM'], 'PTS': p['PTS'],
+                      'repl_val': round(float(replVal[i]), 1)}
+            for (k, v) in extra.items():
+                player[k] = round(float(v[i]), 2)
+            out.append(player)
+        return out
+
+    def name(self, player):
+        return '{FIRST:} {LAST:}'.format(**player).strip()
+
+    def positions(self, player):
+        """ Every position the player is eligible at, e.g. 'RB, WR' """
+        return ', '.join(self.table.position_labels(player[ffldraft.IDX]))
+
+    def _apply(self, views, stale=()):
+        """ Record the views which differ from what clients have, and drop
+            the stale ones which were not recomputed. Call with cond held
+
+        """
+        delta = {}
+        for (key, value) in views.items():
+            if self.views.get(key) != value:
+                delta[key] = value
+        for key in stale:
+            if key not in views and key in self.views:
+                delta[key] = None
+
+        self.version += 1
+        for (key, value) in delta.items():
+            if value is None:
+                del self.views[key]
+            else:
+                self.views[key] = value
+        self.history.append((self.version, delta))
+        self.cond.notify_all()
+
+    # Keeping up with the draft
+    def on_pick(self, players, teamName):
+        """ DraftData listener. A pick can only change the lineups of the
+            team picking and the teams the players came from (from the draft
+            log); an undo (teamName None) could be anyone's, so redo them all
+
+        """
+        with self.cond:
+            teams = self.teams()
+            stale = [k for k in self.views if not k.startswith('team/')]
+            if teamName is None:
+                touched = teams
+                stale = list(self.views)
+            else:
+                moved = set([teamName] + self.draftData.log.stack[-1]['from'])
+                touched = [t for t in teams if t in moved]
+                stale += ['team/' + t for t in moved]
+            self._apply(self.compute(touched), stale)
+
+    # Client side
+    def state(self):
+        with self.cond:
+            return {'version': self.version, 'full': True, 'views': dict(self.views)}
+
+    def updates(self, since, timeout=POLL_TIMEOUT):
+        """ The views changed after version since, waiting up to timeout
+            seconds for there to be any. If since is older than the history
+            we keep, everything is sent
+
+        """
+        deadline = time.time() + timeout
+        with self.cond:
+            if since > self.version:
+                # a client of some earlier server; start it over
+                return self.state()
+
+            while self.version <= since:
+                left = deadline - time.time()
+                if left <= 0:
+                    break
+                self.cond.wait(left)
+
+            if self.history and since < self.history[0][0] - 1:
+                return self.state()
+
+            views = {}
+            for (version, delta) in self.history:
+                if version > since:
+                    views.update(delta)
+            return {'version': self.version, 'full': False, 'views': views}
+
+    def pick(self, team, row=None, first=None, last=None, price=None, pos=None):
+        """ Draft a player (by row, or by name and maybe position) onto
+            team; in an auction, sell him for price. Only free agents can
+            be picked: a rostered player is moved by an undo, or by a pick
+            onto 'FA' which puts him back in the pool
+
+        """
+        with self.cond:
+            if row is None:
+                row = self.draftData.find_player(first, last or '', pos)
+                if row is None:
+                    raise ValueError("no player named {} {}".format(first, last))
+            if not 0 <= row < len(self.table):
+                raise ValueError("no player at row {}".format(row))
+            fteam = self.table['F TEAM'][row]
+            if team == 'FA':
+                if fteam == FA_CODE:
+                    raise ValueError("player at row {} is already a free agent".format(row))
+                self.draftData.been_drafted([self.table.record(row)], team, self.posList)
+                return self.version
+            if fteam != FA_CODE:
+                msg = "player at row {} is already on {}".format(
+                    row, self.table.label('F TEAM', fteam))
+                logger.warning("rejected a pick by {}: {}".format(team, msg))
+                raise ValueError(msg)
+            if self.auction:
+                if price is None:
+                    raise ValueError("an auction pick needs a price")
+                self.auction.sell([self.table.record(row)], team, int(price))
+            else:
+                self.draftData.been_drafted([self.table.record(row)], team, self.posList)
+            return self.version
+
+    def undo(self):
+        with self.cond:
+            self.draftData.undo_last_pick(self.posList)
+            return self.version
+
+
+#---------------------------#
+#   HTTP                    #
+#---------------------------#
+
+class DraftHandler(BaseHTTPRequestHandler):
+    """ json in, json out; the feed lives on the server """
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        try:
+            if url.path == '/state':
+                self.reply(self.server.feed.state())
+            elif url.path == '/updates':
+                since = int(query.get('since', ['0'])[0])
+                timeout = min(float(query.get('timeout', [POLL_TIMEOUT])[0]), POLL_TIMEOUT)
+                self.reply(self.server.feed.updates(since, timeout))
+            else:
+                self.reply({'error': 'not found'}, 404)
+        except ValueError as e:
+            self.reply({'error': str(e)}, 400)
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            length = int(self.headers.getheader('content-length') or 0)
+            body = json.loads(self.rfile.read(length) or '{}')
+            if url.path == '/pick':
+                version = self.server.feed.pick(
+                    str(body['team']), body.get('row'), body.get('first'), body.get('last'),
+                    body.get('price'), body.get('pos'))
+                self.reply({'version': version})
+            elif url.path == '/undo':
+                self.reply({'version': self.server.feed.undo()})
+            else:
+                self.reply({'error': 'not found'}, 404)
+        except (KeyError, ValueError) as e:
+            self.reply({'error': str(e)}, 400)
+
+    def reply(self, obj, code=200):
+        payload = json.dumps(obj, separators=(',', ':'))
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+class DraftServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, feed, port=PORT, host=''):
+        HTTPServer.__init__(self, (host, port), DraftHandler)
+        self.feed = feed
+
+
+#---------------------------#
+#   Main routine            #
+#---------------------------#
+
+def main(port=PORT, datafile=ffldraft.F_DATA, logfile=None, budget=None):
+    ffldraft.configure_logging()
+    dd = ffldraft.DraftData.headless(datafile, logfile)
+    auction = AuctionDraft(dd, ffldraft.DRAFT_ORDER, budget) if budget else None
+    server = DraftServer(DraftFeed(dd, auction=auction), port)
+    logger.info("serving the draft on port {}".format(port))
+    try:
+        server.serve_forever()
+    finally:
+        dd.log.close()
+
+
+def _parse_args():
+    """ Port, data file and pick log from the command line """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--port", help="port to listen on", type=int, default=PORT)
+    parser.add_argument("-d", "--datafile", help="projection csv", default=ffldraft.F_DATA)
+    parser.add_argument("-l", "--logfile", help="pick log (resumed if it exists)")
+    parser.add_argument("-b", "--budget", help="auction budget per team", type=int)
+
+    args = parser.parse_args()
+
+    return args
+
+
+if __name__ == '__main__':
+
+    args = _parse_args()
+
+    main(args.port, args.datafile, args.logfile, args.budget)
@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: draftsim.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    Monte Carlo pick recommendations. Starting from the current state of a
+    DraftData, play out the rest of a snake draft many times: opponents take
+    whoever has the best noisy rank (RNK, or ADP if the table has it, scaled
+    by log-normal noise), and I fill open starting slots with the best points
+    available. Every candidate for my next pick is scored by the average
+    value of my final (optimal, see lineup.py) starting lineup.
+
+    Runs are simulated together as (runs x players) arrays, and split into
+    chunks over a process pool. All candidates see the same random draws, so
+    differences between them are not just noise.
+
+Usage:
+    sim = DraftSimulator(dd, myTeam='HPZ', teamOrder=['CL', 'HPZ', ...])
+    for (player, value) in sim.recommend(nRuns=2000):
+        print player['FIRST'], player['LAST'], value
+
+"""
+
+import multiprocessing
+
+import numpy
+
+import zachlog
+
+from ffldraft import POS_LIST
+from lineup import LineupSolver, parse_slots
+from playertable import FA_CODE, POS_MASK
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+ROUNDS = 16
+SIGMA = 0.25
+CANDIDATES_PER_POS = 2
+POOL_FACTOR = 3
+
+logger = zachlog.getLogger(__name__)
+
+
+#---------------------------#
+#   Draft order             #
+#---------------------------#
+
+def snake_order(teamOrder, rounds=ROUNDS):
+    """ The team making each overall pick of a snake draft, given the first
+        round order
+
+    """
+    order = []
+    for r in range(rounds):
+        order += teamOrder if r % 2 == 0 else teamOrder[::-1]
+    return order
+
+
+#---------------------------#
+#   Simulator               #
+#---------------------------#
+
+class DraftSimulator():
+    """ Estimate the expected final lineup value of each candidate pick """
+    def __init__(self, draftData, myTeam, teamOrder, rounds=ROUNDS,
+                 posList=None, sigma=SIGMA):
+        self.draftData = draftData
+        self.table = draftData.table
+        self.myTeam = myTeam
+        self.order = snake_order(teamOrder, rounds)
+        self.posList = posList or POS_LIST
+        self.sigma = sigma
+
+    def picks_made(self):
+        return int((self.table['F TEAM'] != FA_CODE).sum())
+
+    def default_candidates(self, perPos=CANDIDATES_PER_POS):
+        """ The best few free agents at every position, each once even if
+            he is among the best at several
+
+        """
+        byPos = self.draftData.pool.top_n_by_position(perPos, isFA=True)
+        candidates, seen = [], set()
+        for rows in byPos.values():
+            for row in rows:
+                if row not in seen:
+                    seen.add(row)
+                    candidates.append(row)
+        return candidates
+
+    def recommend(self, candidates=None, nRuns=2000, pickNumber=None,
+                  processes=None, seed=None):
+        """ Return [(player dict, expected lineup pts), ...], best first.
+            candidates are table rows (default: default_candidates()), and
+            pickNumber is the overall pick we are at (default: the number of
+            players drafted so far)
+
+        """
+        candidates = list(candidates) if candidates else self.default_candidates()
+        pickNumber = self.picks_made() if pickNumber is None else pickNumber
+
+        # the picks still to come, up to and including my last one
+        sequence = [team == self.myTeam for team in self.order[pickNumber:]]
+        if True not in sequence:
+            raise ValueError("{} has no picks left".format(self.myTeam))
+        sequence = sequence[:len(sequence) - sequence[::-1].index(True)]
+        sequence.remove(True)   # my next pick is the candidate
+
+        pool = self._pool_rows(len(sequence), candidates)
+        pool = pool[numpy.argsort(-self.table['PTS'][pool], kind='mergesort')]
+        local = {row: i for (i, row) in enumerate(pool)}
+        rank = self.table['ADP' if 'ADP' in self.table else 'RNK']
+
+        mine = self.table.by_points(self.table.mask(onTeam=self.myTeam))
+
+        shared = {
+            'pts': self.table['PTS'][pool].astype(float),
+            'rank': rank[pool].astype(float),
+            'masks': self.table[POS_MASK][pool],
+            'minePts': self.table['PTS'][mine].astype(float),
+            'mineMasks': self.table[POS_MASK][mine],
+            'candidates': [local[row] for row in candidates],
+            'sequence': sequence,
+            'solver': LineupSolver(parse_slots(self.posList), self.table),
+            'sigma': self.sigma,
+        }
+
+        processes = processes or multiprocessing.cpu_count()
+        seeds = numpy.random.RandomState(seed).randint(0, 2 ** 31 - 1, processes)
+        chunks = [dict(shared, nRuns=n, seed=s)
+                  for (n, s) in zip(_split(nRuns, processes), seeds) if n]
+
+        logger.info("simulating {} drafts for {} candidates in {} chunks".format(
+            nRuns, len(candidates), len(chunks)))
+        if len(chunks) == 1:
+            totals = [_simulate_chunk(chunks[0])]
+        else:
+            workers = multiprocessing.Pool(len(chunks))
+            try:
+                totals = workers.map(_simulate_chunk, chunks)
+            finally:
+                workers.close()
+                workers.join()
+
+        expected = numpy.sum(totals, axis=0) / float(nRuns)
+        recs = self.table.records(candidates)
+        return sorted(zip(recs, expected.tolist()), key=lambda x: -x[1])
+
+    def _pool_rows(self, nPicks, candidates):
+        """ The free agents anyone could plausibly take in the remaining
+            picks: the best ranked POOL_FACTOR x nPicks, plus the candidates
+            (an array of rows, in rank order)
+
+        """
+        rank = self.table['ADP' if 'ADP' in self.table else 'RNK']
+        fa = numpy.flatnonzero(self.table['F TEAM'] == FA_CODE)
+        fa = fa[numpy.argsort(rank[fa], kind='mergesort')]
+        pool = fa[:POOL_FACTOR * nPicks + len(candidates)].tolist()
+        inPool = set(pool)
+        return numpy.array(pool + [row for row in candidates if row not in inPool])
+
+
+def _split(n, k):
+    """ Split n into k nearly equal integer parts """
+    return [n // k + (1 if i < n % k else 0) for i in range(k)]
+
+
+def _simulate_chunk(args):
+    """ Simulate args['nRuns'] drafts for every candidate and return the sum
+        of my lineup values per candidate. The pool arrays are sorted by
+        descending points. Module level so the process pool can pickle it
+
+    """
+    pts, masks, solver = args['pts'], args['masks'], args['solver']
+    local = solver.local(masks)
+    nRuns, M = args['nRuns'], len(pts)
+    rng = numpy.random.RandomState(args['seed'])
+    noisyRank = args['rank'] * numpy.exp(args['sigma'] * rng.standard_normal((nRuns, M)))
+
+    # every run's opponents work down their own noisy board; sort it once and
+    # keep a pointer per run instead of an argmin over the pool per pick
+    board = numpy.argsort(noisyRank, axis=1)
+    del noisyRank
+
+    r = numpy.arange(nRuns)
+    nMine = len(args['minePts']) + 1 + sum(args['sequence'])
+    totals = numpy.zeros(len(args['candidates']))
+    for (j, cand) in enumerate(args['candidates']):
+        taken = numpy.zeros((nRuns, M), dtype=bool)
+        taken[:, cand] = True
+        onBoard = numpy.zeros(nRuns, dtype=int)
+
+        myPts = numpy.full((nRuns, nMine), -numpy.inf)
+        myMasks = numpy.zeros((nRuns, nMine), dtype=masks.dtype)
+        k = len(args['minePts'])
+        myPts[:, :k] = args['minePts']
+        myMasks[:, :k] = args['mineMasks']
+        myPts[:, k] = pts[cand]
+        myMasks[:, k] = masks[cand]
+        k += 1
+
+        # the load of the starters so far (the same in every run)
+        values, starting = solver.solve(myPts[:1, :k], myMasks[:1, :k])
+        load = numpy.tile(solver.load(myMasks[0, :k][starting[0]]), (nRuns, 1))
+
+        for isMine in args['sequence']:
+            if isMine:
+                # fill an open starting slot if we can, else best available.
+                # The pool is sorted by points, so "best" is the first index
+                avail = ~taken
+                fits = solver.fits(load)
+                ok = avail & fits[:, local]
+                starts = ok.any(axis=1)
+                choice = numpy.where(starts, ok.argmax(axis=1), avail.argmax(axis=1))
+                myPts[:, k] = pts[choice]
+                myMasks[:, k] = masks[choice]
+                load[starts] += solver.contained[local[choice[starts]]]
+                k += 1
+            else:
+                # skip past anyone on the board who has already gone
+                choice = board[r, onBoard]
+                gone = numpy.flatnonzero(taken[r, choice])
+                while len(gone):
+                    onBoard[gone] += 1
+                    choice[gone] = board[gone, onBoard[gone]]
+                    gone = gone[taken[gone, choice[gone]]]
+                onBoard += 1
+
+            taken[r, choice] = True
+
+        totals[j] = solver.values(myPts, myMasks).sum()
+
+    return totals
@@ -16,15 +16,23 @@ Usage:
 
 import csv
 import datetime
+import numpy
 import os
-import pylab
 
 import zachlog
 
 from collections import defaultdict
-from math import ceil, floor
 
-pylab.close('All')
+from draftindex import PoolIndex, PositionOrder
+from draftlog import DraftLog
+from draftplots import DraftStatePlot, ReplacementPlot, POS_COLOR
+from draftreplay import read_picks, replay_draft, team_labels
+from lineup import LineupSolver, parse_slots
+from picktimer import StageTimer
+from playerlookup import PlayerLookup
+from playertable import FA_CODE, IDX, POS_MASK
+from projectioncsv import SCHEMA_VERSION, load_projection_csv
+from tablecache import cached_table, source_key
 
 
 #---------------------------#
@@ -46,22 +54,13 @@ LEAGUE_TEAMS = {
     12: ['BCB', 'Brew City Bruisers', 'Matt Hibberd'],
 }
 TEAM_LIST = sorted([v[0] for (k, v) in LEAGUE_TEAMS.items()])
+DRAFT_ORDER = [LEAGUE_TEAMS[k][0] for k in sorted(LEAGUE_TEAMS)]
 
 F_DATA = os.path.join(
     os.path.dirname(os.path.realpath(__file__)),
     'ffl_data_20140901.csv'
 )
 
-POS_COLOR = {
-    'K': 'm',
-    'P': 'y',
-    'QB': 'k',
-    'WR': 'b',
-    'RB': 'r',
-    'TE': 'g',
-    'D/ST': 'c',
-}
-
 POS_LIST = [
     'QB',
     'RB',
@@ -73,74 +72,193 @@ POS_LIST = [
     'K',
 ]
 
+FIGURES = {
+    'f1': (1, [7.5, 5.5]),
+    'f2': (2, [12.5, 7.5]),
+    'fScratch': (3, [7.5, 5.5]),
+}
+
 # logging
-zachlog.Config().configure()
 logger = zachlog.getLogger(__name__)
 
 
+#---------------------------#
+#   Lazy initialization     #
+#---------------------------#
+
+# Importing this module should not touch the display or the logging config:
+# scripts, worker processes and tests only want the data model, and pylab
+# alone costs several times what building a DraftData does. Both are set up
+# the first time something actually needs them.
+_pylab = None
+_loggingConfigured = False
+
+
+def get_pylab():
+    """ pylab, imported (and any leftover figures closed) on first use """
+    global _pylab
+    if _pylab is None:
+        import pylab
+        pylab.close('all')
+        _pylab = pylab
+    return _pylab
+
+
+def configure_logging():
+    """ Configure zachlog once per process """
+    global _loggingConfigured
+    if not _loggingConfigured:
+        zachlog.Config().configure()
+        _loggingConfigured = True
+
+
+#---------------------------#
+#   Shared projections      #
+#---------------------------#
+
+# Everything which depends only on the data file (the frozen player table,
+# its position order and the name lookup) is loaded once per process and
+# shared by every DraftData on that file; a draft only adds an overlay
+_SHARED = {}
+
+
+def shared_projections(datafile=F_DATA, cache=True):
+    """ (table, position order, lookup) for datafile, loaded the first time
+        it is asked for and again only if the file changes. cache=False
+        skips the binary cache (see tablecache.py) when loading
+
+    """
+    path = os.path.realpath(datafile)
+    key = source_key(datafile, SCHEMA_VERSION)
+    if path not in _SHARED or _SHARED[path][0] != key:
+        if cache:
+            table = cached_table(datafile, load_projection_csv, SCHEMA_VERSION)
+        else:
+            table = load_projection_csv(datafile)
+        table.freeze()
+        _SHARED[path] = (key, (table, PositionOrder(table), PlayerLookup(table)))
+    return _SHARED[path][1]
+
+
 #---------------------------#
 #   Live Draft Class        #
 #---------------------------#
 
 class DraftData():
     """ A class object to calculate draft data, who to pick, etc. """
-    def __init__(self, datafile=F_DATA):
+    def __init__(self, datafile=F_DATA, render=True, logfile=None, timing=False):
+        self.render = render
+        self.listeners = []
+        self.timer = StageTimer(timing)
+        self._figures = {}
+        if self.render:
+            configure_logging()
+
         self.load_prediction_data(datafile)
-        self.update_replacement_value()
+        self.pool = PoolIndex(self.table, self.positionOrder)
+
+        # picks are logged to (and, after a crash, recovered from) logfile
+        self.log = DraftLog(logfile)
+        self.log.restore(self)
 
-        self.f1 = pylab.figure(1, figsize=[7.5, 5.5])
-        self.f2 = pylab.figure(2, figsize=[12.5, 7.5])
-        self.fScratch = pylab.figure(3, figsize=[7.5, 5.5])
+        if self.render:
+            self.show_best_replacement_available()
 
-        self.show_best_replacement_available()
+    @classmethod
+    def headless(cls, datafile=F_DATA, logfile=None, timing=False):
+        """ A DraftData without figures or logging setup, for scripts,
+            workers and tests which only need the data model
 
-    def load_prediction_data(self, datafile=F_DATA):
-        """ Open the csv data and load it into an array """
+        """
+        return cls(datafile, render=False, logfile=logfile, timing=timing)
+
+    # Figures are only created when something is first drawn on them
+    def _figure(self, name):
+        if name not in self._figures:
+            num, figsize = FIGURES[name]
+            self._figures[name] = get_pylab().figure(num, figsize=figsize)
+        return self._figures[name]
+
+    @property
+    def f1(self):
+        return self._figure('f1')
+
+    @property
+    def f2(self):
+        return self._figure('f2')
+
+    @property
+    def fScratch(self):
+        return self._figure('fScratch')
+
+    @property
+    def replPlot(self):
+        if 'replPlot' not in self._figures:
+            self._figures['replPlot'] = ReplacementPlot(self.f1)
+        return self._figures['replPlot']
+
+    @property
+    def statePlot(self):
+        if 'statePlot' not in self._figures:
+            self._figures['statePlot'] = DraftStatePlot(self.f2)
+        return self._figures['statePlot']
+
+    def load_prediction_data(self, datafile=F_DATA, cache=True):
+        """ Load the csv data into a player table (see projectioncsv.py).
+            The projections are shared with every other draft on datafile
+            (see shared_projections); self.table is this draft's overlay
+
+        """
         logger.info("Loading data file {}".format(datafile))
+        (self.projections, self.positionOrder,
+         self.lookup) = shared_projections(datafile, cache)
+        self.table = self.projections.overlay()
 
-        with open(datafile, 'r') as fIn:
-            d = list(csv.DictReader(fIn))
-
-        # Make into integers and floats what is integers and floats,
-        # also strip leading whitespace and split the team/pos into
-        # team, pos
-        logger.debug("Cleaning up loaded data")
-        for player in d:
-            # Clean values
-            for (iType, i) in player.items():
-                player[iType] = i = i.strip().replace('--', '0')
-                try:
-                    player[iType] = int(i)
-                except ValueError:
-                    try:
-                        player[iType] = float(i)
-                    except ValueError:
-                        pass
-
-            # Split team / position
-            teampos = player.pop('Team Pos', None)
-            if teampos:
-                t, p = teampos.split(' ')
-                player['TEAM'] = t
-                player['POS'] = p
-
-            # Split name
-            playername = player.pop('Player', None)
-            if playername:
-                fl = player.pop('Player').split(' ')
-                player['FIRST'] = fl[0]
-                player['LAST'] = ' '.join(fl[1:])
-
-        self.predictionData = d
+    @property
+    def predictionData(self):
+        """ The player table as a list of player dicts, in the order given by
+            sort_prediction_vals
+
+        """
+        order = self.sort_prediction_vals()
+        return self._with_repl_val(order, self.update_replacement_value()[order])
+
+    def _with_repl_val(self, rows, replVal=None):
+        """ Player dicts for rows, with their replacement values """
+        if replVal is None:
+            replVal = self.pool.repl_val(rows)
+        recs = self.table.records(rows)
+        for (rec, rv) in zip(recs, replVal):
+            rec['repl_val'] = rv
+        return recs
 
     def sort_prediction_vals(self):
         """ Sort based on whether they have been drafted already, then position,
-            then predicted pts
+            then predicted pts. Returns (and stores) the row order
+
+        """
+        self.order = self.table.draft_order()
+        return self.order
+
+    # Finding a player by name
+    def find_player(self, first, last='', pos=None):
+        """ The one row a named pick (from a picks file, or a client) means,
+            or None: the name (and pos) matches from lookup.by_name, free
+            agents before rostered players, best ranked first. If that
+            leaves more than one player the pick is ambiguous; it is logged,
+            and the best ranked is taken
 
         """
-        self.predictionData = sorted(self.predictionData,
-                                     key=lambda x: (x['F TEAM'], x['POS'],
-                                                    -x['PTS']))
+        rows = self.lookup.by_name(first, last, pos)
+        if not rows:
+            return None
+        fteam = self.table['F TEAM']
+        rows = [r for r in rows if fteam[r] == FA_CODE] or rows
+        if len(rows) > 1:
+            logger.warning("{} {} {} is ambiguous ({} players); taking {} {}, {}".format(
+                first, last, pos or '', len(rows), self.table['FIRST'][rows[0]],
+                self.table['LAST'][rows[0]], ', '.join(self.table.position_labels(rows[0]))))
+        return rows[0]
 
     # Updating who has been drafted -- interactive
     def get_player_interactive(self, allowDrafted=False):
@@ -152,13 +270,9 @@ class DraftData():
         print '\n'
 
         matches = []
-        for player in sorted(self.predictionData, key=lambda x: x['RNK']):
-            isMatch = all([
-                player['FIRST'].lower().startswith(firstNameInit.lower()),
-                player['LAST'].lower().startswith(lastNameInit.lower()),
-            ])
-
-            if isMatch and (allowDrafted or player['F TEAM'] == 'FA'):
+        rows = self.lookup.by_initials(firstNameInit, lastNameInit)
+        for player in self.table.records(rows):
+            if allowDrafted or player['F TEAM'] == 'FA':
                 matches.append(player)
                 print '# {RNK:>4}: {FIRST:} {LAST:}, {TEAM:} {POS:}'.format(**player)
 
@@ -212,16 +326,63 @@ class DraftData():
 
         self.been_drafted(player, 'FA')
 
-    def been_drafted(self, players, teamName, posList=POS_LIST):
-        """ Update the prediction data to indicate a draft """
-        for player in players:
-            player['F TEAM'] = teamName
+    def been_drafted(self, players, teamName, posList=POS_LIST, price=None):
+        """ Update the prediction data to indicate a draft. Only the pools
+            the players move between are touched; see PoolIndex. In an
+            auction the price paid is kept with the pick in the log
 
-            logger.info('{FIRST:} {LAST:} has been drafted by {F TEAM:}'.format(**player))
-
-        self.update_replacement_value()
-        self.show_best_replacement_available()
-        self.state_of_draft(posList)
+        """
+        with self.timer.stage('total'):
+            rows = [player[IDX] for player in players]
+            previous = [self.table.label('F TEAM', self.table['F TEAM'][row]) for row in rows]
+            with self.timer.stage('move'):
+                for player in players:
+                    player['F TEAM'] = teamName
+                    self.pool.move(player[IDX], teamName)
+
+                    logger.info('{FIRST:} {LAST:} has been drafted by {F TEAM:}'.format(**player))
+
+            with self.timer.stage('log'):
+                self.log.record_pick(self, rows, previous, teamName, price)
+            self.after_pick(players, teamName, posList)
+        self.timer.pick_done()
+
+    def undo_last_pick(self, posList=POS_LIST):
+        """ Roll back the most recent pick (or undo) by applying its inverse """
+        with self.timer.stage('total'):
+            with self.timer.stage('log'):
+                undone = self.log.record_undo(self)
+            if undone is None:
+                logger.info("nothing to undo")
+                return
+
+            with self.timer.stage('move'):
+                for (row, teamName) in zip(undone['rows'], undone['from']):
+                    self.pool.move(row, teamName)
+
+            players = self.table.records(undone['rows'])
+            for player in players:
+                logger.info('{FIRST:} {LAST:} is back with {F TEAM:}'.format(**player))
+
+            self.after_pick(players, None, posList)
+        self.timer.pick_done()
+
+    def after_pick(self, players, teamName, posList=POS_LIST):
+        """ Bring everything derived from the draft state up to date """
+        # anything keeping derived state up to date (e.g. a LookaheadService)
+        with self.timer.stage('listeners'):
+            for listener in self.listeners:
+                listener(players, teamName)
+
+        if self.render:
+            self.show_best_replacement_available()
+            self.state_of_draft(posList)
+
+    def reset_draft(self):
+        """ Put every player back in the free agent pool """
+        self.table['F TEAM'][:] = FA_CODE
+        self.pool.rebuild()
+        self.log.record_reset(self)
 
     # Updating who has been drafted -- from file
     def simulate_draft_from_file(self, fpicks, fteam, slow=False):
@@ -244,13 +405,15 @@ class DraftData():
             flpos = d['playerpos'].split(' ')
             first = flpos[0]
             last = ' '.join(flpos[1:-1])
+            pos = flpos[-1]
 
-            # Find by name alone
-            players = [player for player in self.predictionData
-                       if player['FIRST'] == first and player['LAST'] == last]
+            # Find by name, and position if the name is shared
+            row = self.find_player(first, last, pos)
 
-            if not players:
+            if row is None:
                 players = self.get_player_interactive()
+            else:
+                players = [self.table.record(row)]
 
             # try to look up the team in LEAUGE_TEAMS first, or else use teamDic
             teamIds = [v[0] for (k, v) in LEAGUE_TEAMS.items() if v[1] == d['team']]
@@ -266,20 +429,40 @@ class DraftData():
             if slow:
                 raw_input()
 
+    def replay_draft_from_file(self, fpicks, leagueTeams=LEAGUE_TEAMS,
+                               posList=POS_LIST, N=25):
+        """ Headless version of simulate_draft_from_file: apply every pick
+            in fpicks without plotting or prompting, and return per-pick
+            metric arrays (see draftreplay.replay_draft)
+
+        """
+        return replay_draft(self, read_picks(fpicks), team_labels(leagueTeams),
+                            posList, N)
+
     # Replacement Value Calculation
     def update_replacement_value(self):
         """ For every player in the draft, calculate their replacement value at
-            their position.  We may generalize this
+            their position (the points lost by taking the next best player in
+            the same position and fantasy team pool).  We may generalize this.
+            Players at several positions take the smallest loss over them.
+            Returns them by row; nothing is stored, so for a few players
+            pool.repl_val is cheaper
 
         """
-        self.sort_prediction_vals()
+        # one entry per (player, eligible position), in pool order
+        rows, pos = self.table.eligibility()
+        pts = self.table['PTS'][rows]
+        fteam = self.table['F TEAM'][rows]
+        order = numpy.lexsort((rows, -pts, pos, fteam))
+        rows, pos, pts, fteam = rows[order], pos[order], pts[order], fteam[order]
 
-        for (i, pNow) in enumerate(self.predictionData[:-1]):
-            pNext = self.predictionData[i + 1]
+        samePool = (pos[:-1] == pos[1:]) & (fteam[:-1] == fteam[1:])
+        replVal = numpy.zeros(len(order))
+        replVal[:-1] = numpy.where(samePool, pts[1:] - pts[:-1], 0.0)
 
-            pNow['repl_val'] = (pNext['PTS'] - pNow['PTS']
-                                if pNow['POS'] == pNext['POS']
-                                else 0.0)
+        out = numpy.full(len(self.table), -numpy.inf)
+        numpy.maximum.at(out, rows, replVal)
+        return out
 
     def top_n(self, N=None, pos=None, isFA=None, onTeam=None):
         """ Return the top N people which satisfy the requirements passed in
@@ -287,14 +470,15 @@ class DraftData():
             they are on a specific team, the list will be filtered accordingly
 
         """
-        self.sort_prediction_vals()
-        filt = (el for el in self.predictionData
-                if (pos is None or el['POS'] == pos)
-                and (isFA is None or (el['F TEAM'] == 'FA') == isFA)
-                and (onTeam is None or el['F TEAM'] == onTeam))
+        return self._with_repl_val(self.pool.top_n(N, pos, isFA, onTeam))
 
-        N = N if N else len(self.predictionData)
-        return sorted(filt, key=lambda x: -x['PTS'])[:N]
+    def top_n_by_position(self, N=None, isFA=None, onTeam=None):
+        """ Same as top_n, but for every position at once. Returns a dict of
+            position: list of the top N players there
+
+        """
+        return {pos: self._with_repl_val(rows)
+                for (pos, rows) in self.pool.top_n_by_position(N, isFA, onTeam).items()}
 
     def show_best_replacement_available(self, N=25):
         """ Extract the best N remaining players at each position, and determine
@@ -302,39 +486,31 @@ class DraftData():
             picks to give a future-looking view on the decision to not draft the
             calculated top remaining player
 
+        """
+        curves, labels = self.best_replacement_available(N)
+
+        with self.timer.stage('render'):
+            self.replPlot.update({pos: curve for (pos, (rows, curve)) in curves.items()},
+                                 labels, N)
+
+            logger.debug("Displaying")
+            self.replPlot.flush()
+
+    def best_replacement_available(self, N=25):
+        """ The numbers behind show_best_replacement_available: the
+            replacement curve of the best N remaining at each position, and a
+            label naming the best of them
+
         """
         logger.info("calculating the top {} available at each position".format(N))
-        positions = {el['POS'] for el in self.predictionData}
-        topNDic = {pos: self.top_n(N=N, pos=pos, isFA=True) for pos in positions}
-        goneDic = {pos: self.top_n(pos=pos, isFA=False) for pos in positions}
-
-        # Prepare replacement value plotting, capn
-        self.f1.clf()
-        s1 = self.f1.add_subplot(111)
-
-        for (pos, posList) in topNDic.items():
-            try:
-                # Update to have cumulative sums
-                for (i, player) in enumerate(posList):
-                    player['cum_repl_val'] = sum(p['repl_val'] for p in posList[:i + 1])
-
-                best = posList[0]
-                lab = "{}, {} {}".format(best['POS'], best['FIRST'], best['LAST'])
-                c = POS_COLOR.get(pos, 'k')
-                s1.plot([x['cum_repl_val'] for x in posList], color=c, marker='o',
-                        mfc='w', mec=c, mew=2, lw=2, label=lab)
-            except:
-                logger.error('fuuuuuck')
-                logger.info("pos     = {}".format(pos))
-                logger.info("posList = {}".format(posList))
-                raise
-
-        s1.legend(loc='lower left', fontsize=10)
-        s1.set_ylim((-200, 0))
-        s1.set_xlim((-0.5, 24.5))
-
-        logger.debug("Displaying")
-        self.f1.show()
+        with self.timer.stage('replacement'):
+            curves = self.pool.replacement_curves(N=N)
+
+            labels = {}
+            for (pos, (rows, curve)) in curves.items():
+                best = self.table.record(rows[0])
+                labels[pos] = "{}, {} {}".format(pos, best['FIRST'], best['LAST'])
+        return curves, labels
 
     def state_of_draft(self, posList=POS_LIST):
         """ Create an N-team panelled histogram plot which shows how each team
@@ -347,12 +523,36 @@ class DraftData():
             present mean, not by forgoing for replacement)
 
         """
-        positions = {el['POS'] for el in self.predictionData}
-        bestAvailable = {pos: self.top_n(N=1, pos=pos, isFA=True) for pos in positions}
+        teamList, binVals = self.draft_state(posList)
+
+        # Plot that shit
+        if not teamList:
+            return
+
+        with self.timer.stage('render'):
+            flexKeys = sorted({k for (x, v) in binVals.items() for k in v.keys()
+                               if 'flex_' in k})
+            self.statePlot.update(teamList, posList, flexKeys, binVals)
+
+            logger.debug("Displaying")
+            self.statePlot.flush()
+
+    def draft_state(self, posList=POS_LIST):
+        """ The numbers behind state_of_draft: the teams with picks, and the
+            points of each of them at each position over the league average
+
+        """
+        with self.timer.stage('summary'):
+            teamList = self.table.labels_in_use('F TEAM', self.table['F TEAM'] != FA_CODE)
+            teamSummary = self.team_draft_summary(posList, teamList)
+            binVals = self._bin_vals(teamSummary)
+        return teamList, binVals
 
-        teamList = sorted({el['F TEAM'] for el in self.predictionData if not el['F TEAM'] == 'FA'})
-        teamSummary = self.team_draft_summary(posList, teamList)
+    def _bin_vals(self, teamSummary):
+        """ Every team's points at each position minus the league average
+            there (adds a TOTAL to each team summary)
 
+        """
         # Total
         for (team, teamVals) in teamSummary.items():
             teamVals['TOTAL'] = {'PTS': sum(v.get('PTS', 0)
@@ -375,106 +575,46 @@ class DraftData():
         binVals = {team: {pos: teamVals.get(pos, {}).get('PTS', 0) - avVal
                           for (pos, avVal) in avVals.items()}
                    for (team, teamVals) in teamSummary.items()}
-
-        # Plot that shit
-        N = len(teamList)
-        J = floor(N ** .5)
-        I = ceil(N / float(J))
-        self.f2.clf()
-        self.f2.subplots_adjust(left=0.04, bottom=0.06, right=0.98, top=0.95)
-
-        flexKeys = sorted({k for (x, v) in binVals.items() for k in v.keys()
-                           if 'flex_' in k})
-        posListSpec = posList + flexKeys + ['TOTAL']
-        lefts = [i for i in range(len(posListSpec))]
-        width = 0.4
-        mids = [i + width for i in range(len(posListSpec))]
-        allVals = [v for (team, teamVals) in binVals.items() for (k, v) in teamVals.items()
-                   if not 'flex_' in k]
-        maxval = max(allVals)
-        minval = min(allVals)
-        for (i, team) in enumerate(sorted(teamSummary.keys())):
-            sNow = self.f2.add_subplot(I, J, i + 1)
-
-            # current vals -- starters
-            sNow.bar(
-                left=lefts[:len(posList)],
-                height=[binVals[team][pos] for pos in posList],
-                width=width,
-                color='blue',
-                alpha=0.75
-            )
-
-            # current vals -- flex
-            if flexKeys:
-                sNow.bar(
-                    left=lefts[len(posList): len(posList) + len(flexKeys)],
-                    height=[binVals[team][pos] for pos in flexKeys],
-                    width=width,
-                    color='blue',
-                    alpha=0.35
-                )
-
-            # current vals -- total
-            tot = binVals[team]['TOTAL']
-            sNow.bar(
-                left=lefts[-1],
-                height=[tot],
-                width=width,
-                color='green' if tot > 0 else 'red'
-            )
-
-            sNow.set_title(team)
-            sNow.set_xticks(mids)
-            sNow.set_xticklabels(posListSpec, fontsize=8)
-            sNow.set_ylim((minval, maxval))
-
-        logger.debug("Displaying")
-        self.f2.show()
+        return binVals
 
     def team_draft_summary(self, posList=POS_LIST, teamList=TEAM_LIST):
-        """ Return a list of all drafted players, binned by positions (best
-            available)
+        """ Return a dict of team: {slot: player} holding each team's best
+            starting lineup for the slots in posList (see lineup.py), with the
+            rest of the roster in flex_0, flex_1, ... by descending points.
+            Every team is solved in one batched call
 
         """
-        tds = defaultdict(list)
-        # collect all drafted players
-        for player in self.predictionData:
-            fteam = player['F TEAM']
-            if fteam != 'FA':
-                tds[fteam].append(player)
-
-        # Bucket appropriately
-        tdsBucket = defaultdict(lambda: defaultdict())
-
-        # go thorugh all non-slash positions and pop out the best
-        multiPos = [pos for pos in posList if '/' in pos and not pos == 'D/ST']
-        singlePos = [pos for pos in posList if pos not in multiPos]
-        for team in teamList:
-            for pos in singlePos:
-                try:
-                    bestAtPos = max([t for t in tds[team] if t['POS'] == pos],
-                                    key=lambda x: x['PTS'])
-                    tds[team].remove(bestAtPos)
-                except:
-                    bestAtPos = {}
+        solver = LineupSolver(parse_slots(posList), self.table)
 
-                tdsBucket[team][pos] = bestAtPos
+        # every team's roster, best first
+        drafted = numpy.flatnonzero(self.table['F TEAM'] != FA_CODE)
+        fteam = self.table['F TEAM'][drafted]
+        drafted = drafted[numpy.lexsort((-self.table['PTS'][drafted], fteam))]
+        fteam = self.table['F TEAM'][drafted]
+        rosters = [drafted[fteam == self.table.code('F TEAM', team)] for team in teamList]
 
-            for pos in multiPos:
-                try:
-                    bestAtPos = max([t for t in tds[team] if t['POS'] in pos.split('/')],
-                                    key=lambda x: x['PTS'])
-                    tds[team].remove(bestAtPos)
-                except:
-                    bestAtPos = {}
+        K = max([len(roster) for roster in rosters] + [1])
+        pts = numpy.full((len(teamList), K), -numpy.inf)
+        masks = numpy.zeros((len(teamList), K), dtype=int)
+        for (t, roster) in enumerate(rosters):
+            pts[t, :len(roster)] = self.table['PTS'][roster]
+            masks[t, :len(roster)] = self.table[POS_MASK][roster]
 
-                tdsBucket[team][pos] = bestAtPos
+        values, starting = solver.solve(pts, masks)
 
-            # If anyone remains in tds[team] at this point, move them into flex
-            # positions -- sort them according to their pts within the reamining
-            # team
-            for (i, player) in enumerate(sorted(tds[team], key=lambda x: -x['PTS'])):
+        tdsBucket = defaultdict(lambda: defaultdict())
+        for (t, (team, roster)) in enumerate(zip(teamList, rosters)):
+            isStarter = starting[t, :len(roster)]
+            starters = numpy.flatnonzero(isStarter)
+
+            for name in solver.names:
+                tdsBucket[team][name] = {}
+            for (i, s) in zip(starters, solver.assign(masks[t, starters])):
+                tdsBucket[team][solver.names[s]] = self.table.record(roster[i])
+
+            # Everyone else goes into flex positions -- sorted according to
+            # their pts within the remaining team
+            for (i, player) in enumerate(self.table.records(roster[~isStarter])):
                 tdsBucket[team]['flex_{}'.format(i)] = player
 
         return tdsBucket
@@ -485,28 +625,25 @@ class DraftData():
 
         """
         logger.info("calculating the top {} available {}s".format(N, pos))
-        topN = self.top_n(N=N, pos=pos, isFA=True)
+        rows, curve = self.pool.replacement_curves(N=N, pos=pos, inclusive=False).get(pos, ([], []))
+        topN = self.table.records(rows)
 
         self.fScratch.clf()
         s3 = self.fScratch.add_subplot(111)
 
         try:
-            # Update to have cumulative sums
-            for (i, player) in enumerate(topN):
-                player['cum_repl_val'] = sum(p['repl_val'] for p in topN[:i])
-
             best = topN[0]
             lab = "Top {} {}".format(N, pos)
             c = POS_COLOR.get(pos, 'k')
-            s3.plot([x['cum_repl_val'] for x in topN], color=c, marker='o',
-                    mfc='w', mec=c, mew=2, lw=2, label=lab)
+            s3.plot(curve, color=c, marker='o', mfc='w', mec=c, mew=2, lw=2,
+                    label=lab)
 
             # Annotating with player names
-            for (i, player) in enumerate(topN):
+            for (i, (player, cumReplVal)) in enumerate(zip(topN, curve)):
                 s3.annotate(
                     '{FIRST:} {LAST:}, {TEAM:}'.format(**player),
-                    xy=(i, player['cum_repl_val']),
-                    xytext=(i, 0.975 * player['cum_repl_val']),
+                    xy=(i, cumReplVal),
+                    xytext=(i, 0.975 * cumReplVal),
                     rotation=50,
                     horizontalalignment='left',
                     verticalalignment='bottom',
@@ -9,6 +9,23 @@ created: 2014-08-31
 Description:
     Hit the web for draft data; save it localy or just return that ish
 
+    The projection table comes _PAGE_SIZE players a page. Rather than
+    following the NEXT link one page at a time, the page offsets are worked
+    out up front and a wave of pages is fetched at once by a small thread
+    pool over one keep-alive session (failed requests are retried with
+    backoff). Pages are handed back in rank order, and another wave is only
+    started if the last page of this one was full. Pages go through the
+    shared on-disk HTTPCache, so a re-run only downloads pages which changed.
+
+    Writing the csv is a pipeline of generators (pages -> typed rows -> csv),
+    so the first players are on disk while later pages are still coming in,
+    and only the pages in flight are held in memory.
+
+    Pages are parsed by a ProjectionParser, whose XPaths are compiled once,
+    and which splits the "PLAYER, TEAM POS" cell with one compiled regex. It
+    hands back typed rows (ints, PTS a float) with the repeated YDS and TD
+    headers told apart the way projectioncsv does (PASS YDS, RUSH YDS, ...).
+
 Usage:
     <usage>
 
@@ -17,12 +34,18 @@ Usage:
 import argparse
 import csv
 import datetime
+import lxml.etree
 import lxml.html
 import os
-import requests
+import re
+
+from multiprocessing.pool import ThreadPool
 
 import zachlog
 
+from httpcache import HTTPCache, session_opener
+from projectioncsv import COLUMN_DTYPE, MISSING, column_names
+
 
 #-----------------------#
 #   Module Constants    #
@@ -33,11 +56,19 @@ _X_TABLE = 'table[@id="playertable_0"]'
 _X_HEADER = 'tr[@class="playerTableBgRowSubhead tableSubHead"]'
 _X_ROWS = 'tr[@class="pncPlayerRow playerTableBgRow0" or @class="pncPlayerRow playerTableBgRow1"]'
 _X_PAGE_NAV = 'div[@class="paginationNav"]'
+_PAGE_SIZE = 40
+_N_PAGES = 32
+_WORKERS = 16
+_RETRIES = 3
+_BACKOFF = 0.5
+_TIMEOUT = 30
+_X_CELLS = './td'
+_X_NEXT = '//{}/a[contains(., "NEXT")]/@href'
+_X_STRING = lxml.etree.XPath('string()')
 _OUT = os.path.join(
     os.path.dirname(os.path.realpath(__file__)),
     'ffl_data_%Y%m%d.csv'
 )
-_OUT = datetime.datetime.now().strftime(_OUT)
 
 MASCOT = {
     '49ers': 'SF',
@@ -74,136 +105,332 @@ MASCOT = {
     'Vikings': 'Min',
 }
 
+# "First Last, Team\xa0POS" or "Mascot D/ST\xa0D/ST"; anything after a
+# second \xa0 (injury status) is dropped
+_RE_PLAYER = re.compile(
+    u'^\\s*(?P<name>[^,\xa0]+?)(?:, (?P<team>[^\xa0]+?))?\xa0(?P<pos>[^\xa0]*)', re.UNICODE)
+_RE_POS_SEP = re.compile(r'\s*,\s*')
+
+# the columns of the csv, in this order (anything else follows)
+_FIELDS = ['FIRST', 'LAST', 'TEAM', 'POS', 'F TEAM'] + [
+    f for (f, dtype) in COLUMN_DTYPE if f not in ('FIRST', 'LAST')]
+
 # logging
-zachlog.Config().configure()
 logger = zachlog.getLogger(__name__)
 
 
+def default_outname(now=None):
+    """ Today's (or now's) data file name """
+    return (now or datetime.datetime.now()).strftime(_OUT)
+
+
 #-------------------------------#
 #   ESPN prediction info        #
 #-------------------------------#
 
 def espn_get_prediction_data(espnPredBase=_ESPN_PREDICTION_BASE,
                              leagueId=209006, xTable=_X_TABLE,
-                             xHeader=_X_HEADER, xPageNav=_X_PAGE_NAV):
-    """ Hit the websites and parse scoring predictions into a listdict """
+                             xHeader=_X_HEADER, xPageNav=_X_PAGE_NAV,
+                             workers=_WORKERS):
+    """ Hit the websites and parse scoring predictions into a list of typed
+        player dicts (see ProjectionParser.rows)
+
+    """
     logger.info("Fetching ESPN prediction data")
-    predictionData = []
-    for pred in espn_prediction_pages(espnPredBase, leagueId, xTable, xHeader,
-                                      xPageNav):
-        predictionData += pred
+    return list(espn_prediction_rows(espnPredBase, leagueId, xTable, xHeader,
+                                     xPageNav, workers))
+
+
+def espn_session(workers=_WORKERS, retries=_RETRIES, backoff=_BACKOFF):
+    """ A requests session keeping up to workers connections alive, which
+        retries failed requests with exponential backoff
+
+    """
+    # requests is slow to import and only needed once we hit the web
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.packages.urllib3.util.retry import Retry
+
+    retry = Retry(total=retries, backoff_factor=backoff,
+                  status_forcelist=[500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
-    return predictionData
+
+def espn_page_url(espnPredBase=_ESPN_PREDICTION_BASE, leagueId=209006, startIndex=0):
+    """ The url of the projection page starting at player startIndex """
+    url = espnPredBase.format(leagueId)
+    if not startIndex:
+        return url
+    return '{}{}startIndex={}'.format(url, '&' if '?' in url else '?', startIndex)
 
 
 def espn_prediction_pages(espnPredBase=_ESPN_PREDICTION_BASE, leagueId=209006,
                           xTable=_X_TABLE, xHeader=_X_HEADER,
-                          xPageNav=_X_PAGE_NAV):
-    """ Create a generator which returns the html object of pages with
-        prediction data tables on them
+                          xPageNav=_X_PAGE_NAV, workers=_WORKERS,
+                          nPages=_N_PAGES, session=None, cache=None,
+                          parser=None):
+    """ Create a generator which returns the typed rows (see
+        ProjectionParser.rows) of every page, in rank order. Pages are
+        fetched nPages at a time, by workers threads sharing one session,
+        through cache (by default the shared HTTPCache)
 
     """
-    urlNext = None
-
-    while True:
-        # get new page and parse to html object
-        url = urlNext if urlNext else espnPredBase.format(leagueId)
-        logger.debug("parsing url {}".format(url))
-        page = requests.get(url)
-        html = lxml.html.fromstring(page.text)
-
-        # check if it has info
-        if espn_has_prediction_info(html, xTable, xHeader):
-            # get next url and yield the parse table
-            yield espn_get_prediction(html, xTable, xHeader)
-            urlNext = espn_get_url_next(html)
-            if urlNext is None:
-                raise StopIteration()
-        else:
-            raise StopIteration()
+    opener = session_opener(session or espn_session(workers), _TIMEOUT)
+    cache = cache or HTTPCache()
+    parser = parser or ProjectionParser(xTable, xHeader, xPageNav=xPageNav)
+
+    def fetch(startIndex):
+        url = espn_page_url(espnPredBase, leagueId, startIndex)
+        logger.debug("fetching url {}".format(url))
+        return lxml.html.fromstring(cache.get(url, opener).text)
+
+    pool = ThreadPool(workers)
+    try:
+        start = 0
+        while True:
+            offsets = range(start, start + nPages * _PAGE_SIZE, _PAGE_SIZE)
+            for html in pool.imap(fetch, offsets):
+                # past the end of the table
+                pred = parser.rows(html)
+                if not pred:
+                    return
+                yield pred
+                # the last page
+                if len(pred) < _PAGE_SIZE or parser.next_url(html) is None:
+                    return
+            start = offsets[-1] + _PAGE_SIZE
+    finally:
+        # drop whatever is still in flight past the end of the table
+        pool.terminate()
 
 
 def espn_has_prediction_info(h, xTable=_X_TABLE, xHeader=_X_HEADER):
     """ Check and see whether this html object contains a subheader row """
-    return espn_get_prediction_headers(h, xTable, xHeader) is not None
+    return bool(espn_get_prediction_headers(h, xTable, xHeader))
 
 
 def espn_get_prediction(html, xTable=_X_TABLE, xHeader=_X_HEADER, xRows=_X_ROWS):
     """ Parse the html text/object into a listdict of score prediction """
-    headers = espn_get_prediction_headers(html, xTable, xHeader)
+    parser = ProjectionParser(xTable, xHeader, xRows)
+    headers = parser.headers(html)
 
     if headers is None:
         raise ValueError("This is not a valid table page!")
 
-    trs = html.xpath('//{}/{}'.format(xTable, xRows))
-
-    def tr_to_vals(tr):
-        return [t.text_content().strip() for t in tr.xpath('./td')]
-
-    return [{h: v for (h, v) in zip(headers, tr_to_vals(tr))} for tr in trs]
+    return [dict(zip(headers, cells)) for cells in parser.cells(html)]
 
 
 def espn_get_url_next(html, xPageNav=_X_PAGE_NAV):
     """ Parse the html object for a "next" link of the expected type """
-    try:
-        return [h for h in html.xpath('//{}/a'.format(xPageNav))
-                if 'NEXT' in h.text_content()][0].attrib['href']
-    except:
-        return None
+    return ProjectionParser(xPageNav=xPageNav).next_url(html)
 
 
 def espn_get_prediction_headers(html, xTable=_X_TABLE, xHeader=_X_HEADER):
-    try:
-        xheaders = html.xpath('//{}//{}//td'.format(xTable, xHeader))
-        return [h.text_content().strip() for h in xheaders]
-    except:
-        return None
+    return ProjectionParser(xTable, xHeader).headers(html)
 
 
-def espn_prediction_to_file(outname=_OUT, espnPredBase=_ESPN_PREDICTION_BASE,
+def espn_prediction_to_file(outname=None, espnPredBase=_ESPN_PREDICTION_BASE,
                             leagueId=209006, xTable=_X_TABLE,
                             xHeader=_X_HEADER, xPageNav=_X_PAGE_NAV):
-    """ grab the info from the espn website and write that shit to file """
-    pred = espn_get_prediction_data(espnPredBase, leagueId, xTable, xHeader, xPageNav)
-    multiPosPred = []
-
-    # clean up first
-    for player in pred:
-        # split out player team pos
-        ptp = player.pop('PLAYER, TEAM POS')
-        pt, pos = ptp.split(u"\xa0")[0:2]
-
-        if 'D/ST' in pt:
-            mascot = pt.split(' ')[0]
-            playerName = pt
-            playerTeam = MASCOT[mascot]
-        else:
-            playerName, playerTeam = pt.split(', ')
-
-        splitName = playerName.split(' ')
-        player['FIRST'] = splitName[0]
-        player['LAST'] = ' '.join(splitName[1:])
-        player['TEAM'] = playerTeam
-
-        # Assign to the appropriate fantasy team
-        player['F TEAM'] = player.pop('TYPE')
-
-        # Some players have two positions. DAFUQ.
-        posList = pos.split(', ')
-        for (i, pos) in enumerate(posList):
-            if i == 0:
-                player['POS'] = pos
-            else:
-                newPlayer = player.copy()
-                newPlayer['POS'] = pos
-                multiPosPred.append(newPlayer)
-
-    with open(outname, 'w') as fOut:
-        csvOut = csv.DictWriter(fOut, fieldnames=pred[0].keys())
-        csvOut.writeheader()
-        csvOut.writerows(pred)
-        if multiPosPred:
-            csvOut.writerows(multiPosPred)
+    """ grab the info from the espn website and write that shit to file
+        (outname defaults to today's ffl_data_YYYYMMDD.csv). A pipeline of
+        generators: fetch page -> parse rows -> normalize -> write, so rows
+        are written while later pages are still downloading and nothing but
+        the pages in flight is held in memory
+
+    """
+    outname = outname or default_outname()
+    rows = espn_prediction_rows(espnPredBase, leagueId, xTable, xHeader, xPageNav)
+    n = write_prediction_rows(outname, rows)
+    logger.info("wrote {} players to {}".format(n, outname))
+    return n
+
+
+def espn_prediction_rows(espnPredBase=_ESPN_PREDICTION_BASE, leagueId=209006,
+                         xTable=_X_TABLE, xHeader=_X_HEADER,
+                         xPageNav=_X_PAGE_NAV, workers=_WORKERS):
+    """ Every row of the prediction table as it comes in, in rank order """
+    for pred in espn_prediction_pages(espnPredBase, leagueId, xTable, xHeader,
+                                      xPageNav, workers):
+        for player in pred:
+            yield player
+
+
+def write_prediction_rows(outname, rows):
+    """ Write the player dicts of rows to the csv outname as they come,
+        flushing as we go. The columns are those of the first row (in the
+        order of _FIELDS). The file is written under a temporary name and
+        only moved into place once it is complete. Returns the number of
+        rows written
+
+    """
+    tmp = outname + '.part'
+    n = 0
+    with open(tmp, 'wb') as fOut:
+        csvOut = None
+        for player in rows:
+            player = {_utf8(k): _utf8(v) for (k, v) in player.items()}
+            if csvOut is None:
+                csvOut = csv.DictWriter(fOut, fieldnames=_field_order(player))
+                csvOut.writeheader()
+            csvOut.writerow(player)
+            n += 1
+            if n % _PAGE_SIZE == 0:
+                fOut.flush()
+
+    if not n:
+        os.remove(tmp)
+        raise ValueError("no projections to write to {}".format(outname))
+    os.rename(tmp, outname)
+    return n
+
+
+def _field_order(player):
+    rank = {f: i for (i, f) in enumerate(_FIELDS)}
+    return sorted(player, key=lambda f: (rank.get(f, len(rank)), f))
+
+
+def _utf8(x):
+    return x.encode('utf-8') if isinstance(x, unicode) else x
+
+
+#-------------------------------#
+#   Compiled parser             #
+#-------------------------------#
+
+class ProjectionParser():
+    """ Parse ESPN projection pages with XPaths compiled once. The fill
+        plan (which column becomes which typed field) is worked out once per
+        distinct header row
+
+    """
+    def __init__(self, xTable=_X_TABLE, xHeader=_X_HEADER, xRows=_X_ROWS,
+                 xPageNav=_X_PAGE_NAV):
+        self.xHeaders = lxml.etree.XPath('//{}//{}//td'.format(xTable, xHeader))
+        self.xRows = lxml.etree.XPath('//{}/{}'.format(xTable, xRows))
+        self.xCells = lxml.etree.XPath(_X_CELLS)
+        self.xNext = lxml.etree.XPath(_X_NEXT.format(xPageNav))
+        self.plans = {}
+
+    # Page structure
+    def headers(self, html):
+        """ The subheader row of the table (None if there is none) """
+        headers = [_text(td) for td in self.xHeaders(html)]
+        return headers or None
+
+    def cells(self, html):
+        """ The stripped text of every cell, row by row """
+        return [[_text(td) for td in self.xCells(tr)] for tr in self.xRows(html)]
+
+    def next_url(self, html):
+        hrefs = self.xNext(html)
+        return hrefs[0] if hrefs else None
+
+    # Typed rows
+    def rows(self, html):
+        """ A list of typed player dicts, one per row of the table: FIRST,
+            LAST, TEAM, POS and F TEAM (from TYPE), C and A (from C/A), and
+            every other column as an int (a float if need be; '--' is 0)
+
+        """
+        headers = self.headers(html)
+        if not headers:
+            return []
+        fills, numbers = self.plan(headers)
+
+        rows = []
+        for cells in self.cells(html):
+            if len(cells) < len(headers):
+                logger.warning("skipping short row {}".format(cells))
+                continue
+            row = {name: _number(cells[i]) for (i, name) in numbers}
+            for (i, fill) in fills:
+                fill(row, cells[i])
+            rows.append(row)
+        return rows
+
+    def plan(self, headers):
+        """ How to fill a row from the columns of headers: (i, fill
+            function) for the composite and text columns, (i, name) for the
+            numbers
+
+        """
+        key = tuple(headers)
+        if key not in self.plans:
+            dtype = dict(COLUMN_DTYPE)
+            fills = []
+            numbers = []
+            for (i, name) in enumerate(column_names(headers)):
+                if name in _COLUMN_FILLS:
+                    fills.append((i, _COLUMN_FILLS[name]))
+                elif dtype.get(name) is object:
+                    fills.append((i, _fill_text(name)))
+                else:
+                    numbers.append((i, name))
+            self.plans[key] = (fills, numbers)
+        return self.plans[key]
+
+
+def _text(el):
+    # most cells are plain text; only those with markup need the walk
+    if len(el):
+        return _X_STRING(el).strip()
+    return (el.text or u'').strip()
+
+
+def _number(cell):
+    try:
+        return int(cell)
+    except ValueError:
+        pass
+    cell = cell.replace(',', '')
+    if cell in MISSING:
+        return 0
+    try:
+        return int(cell)
+    except ValueError:
+        return float(cell)
+
+
+def _fill_player(row, cell):
+    m = _RE_PLAYER.match(cell)
+    if m is None:
+        raise ValueError("can't split player cell {!r}".format(cell))
+    name, team, pos = m.group('name', 'team', 'pos')
+    row['FIRST'], _, row['LAST'] = name.partition(' ')
+    # defenses have no ", Team"; they go by their mascot
+    row['TEAM'] = team if team is not None else MASCOT[row['FIRST']]
+    # Some players have two positions. DAFUQ. They stay one row, with
+    # every position in POS ("RB, WR"; see playertable.POS_MASK)
+    row['POS'] = _RE_POS_SEP.sub(', ', pos.strip())
+
+
+def _fill_comp_att(row, cell):
+    comp, _, att = cell.partition('/')
+    row['C'] = _number(comp.strip())
+    row['A'] = _number(att.strip())
+
+
+def _fill_fteam(row, cell):
+    # Assign to the appropriate fantasy team
+    row['F TEAM'] = cell
+
+
+def _fill_text(name):
+    def fill(row, cell):
+        row[name] = cell
+    return fill
+
+
+_COLUMN_FILLS = {
+    'PLAYER, TEAM POS': _fill_player,
+    'TYPE': _fill_fteam,
+    'C/A': _fill_comp_att,
+}
 
 
 #-------------------------------#
@@ -220,6 +447,11 @@ def _parse_args():
     return args
 
 
+def main():
+    zachlog.Config().configure()
+    espn_prediction_to_file()
+
+
 if __name__ == '__main__':
 
     args = _parse_args()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: httpcache.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    An on-disk HTTP response cache shared by everything which scrapes ESPN
+    (LeagueStats/FFFetch.py through urllib2, getdraftdata.py through a
+    requests session), so a re-run only downloads what actually changed.
+
+    Every url has a small json entry (named by the sha1 of the url) holding
+    its validators (ETag, Last-Modified), content type, when it was last
+    checked, and the sha1 of its body; bodies are stored by that sha1, so
+    pages which come back identical are kept once. A response younger than
+    the TTL of its class of url (TTLS; schedule, standings, boxscorequick,
+    projections) is served without asking; an older one is revalidated
+    with If-None-Match / If-Modified-Since and a 304 just refreshes it.
+
+    The cache is kept under maxBytes by dropping the least recently used
+    urls (an entry's mtime is touched on every hit), and the bodies no url
+    points at any more. Entries and bodies are written atomically, so the
+    cache can be shared by threads and by processes.
+
+Usage:
+    cache = HTTPCache()
+    page = cache.get(url)                           # urllib2
+    page = cache.get(url, session_opener(session))  # a requests session
+    page.body, page.text, page.fromCache
+
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib2
+
+import zachlog
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+CACHE_ROOT = os.environ.get(
+    'FFL_HTTP_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'ffl', 'http'))
+MAX_BYTES = 256 * 2 ** 20
+TIMEOUT = 30
+
+# seconds before a cached response is revalidated, by url class
+URL_CLASSES = [
+    ('schedule', re.compile(r'/ffl/schedule\b')),
+    ('standings', re.compile(r'/ffl/standings\b')),
+    ('boxscorequick', re.compile(r'/ffl/boxscorequick\b')),
+    ('projections', re.compile(r'/ffl/tools/projections\b')),
+]
+TTLS = {
+    'schedule': 6 * 3600,
+    'standings': 6 * 3600,
+    'boxscorequick': 24 * 3600,
+    'projections': 12 * 3600,
+    None: 0,
+}
+
+logger = zachlog.getLogger(__name__)
+
+
+#---------------------------#
+#   Responses               #
+#---------------------------#
+
+class CachedResponse():
+    """ What cache.get hands back: status, headers, body (bytes), and
+        whether the body came from disk
+
+    """
+    def __init__(self, status, headers, body, fromCache=False):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.fromCache = fromCache
+
+    @property
+    def text(self):
+        """ The body decoded with the charset of its content type (utf-8 if
+            there is none)
+
+        """
+        m = re.search(r'charset=([\w-]+)', self.headers.get('content-type', ''))
+        return self.body.decode(m.group(1) if m else 'utf-8', 'replace')
+
+
+def url_class(url):
+    for (name, pattern) in URL_CLASSES:
+        if pattern.search(url):
+            return name
+    return None
+
+
+#---------------------------#
+#   Openers                 #
+#---------------------------#
+
+def urllib_opener(url, headers):
+    """ Fetch url with urllib2; returns (status, headers, body) """
+    try:
+        page = urllib2.urlopen(urllib2.Request(url, headers=headers), timeout=TIMEOUT)
+    except urllib2.HTTPError as e:
+        if e.code == 304:
+            return 304, _lower(e.info()), ''
+        raise
+    return page.getcode(), _lower(page.info()), page.read()
+
+
+def session_opener(session, timeout=TIMEOUT):
+    """ An opener fetching through a requests session """
+    def opener(url, headers):
+        page = session.get(url, headers=headers, timeout=timeout)
+        if page.status_code != 304:
+            page.raise_for_status()
+        return page.status_code, _lower(page.headers), page.content
+    return opener
+
+
+def _lower(headers):
+    return {k.lower(): v for (k, v) in headers.items()}
+
+
+#---------------------------#
+#   Cache                   #
+#---------------------------#
+
+class HTTPCache():
+    """ Conditional, size-bounded on-disk cache of GET responses """
+    def __init__(self, root=CACHE_ROOT, maxBytes=MAX_BYTES, ttls=TTLS):
+        self.root = root
+        self.maxBytes = maxBytes
+        self.ttls = ttls
+        self.lock = threading.Lock()
+        self.size = None
+        for d in ('urls', 'bodies'):
+            if not os.path.isdir(os.path.join(root, d)):
+                try:
+                    os.makedirs(os.path.join(root, d))
+                except OSError:
+                    # somebody else just made it
+                    pass
+
+    # Paths
+    def entry_path(self, url):
+        if isinstance(url, unicode):
+            url = url.encode('utf-8')
+        return os.path.join(self.root, 'urls', hashlib.sha1(url).hexdigest() + '.json')
+
+    def body_path(self, digest):
+        return os.path.join(self.root, 'bodies', digest)
+
+    # Lookups
+    def get(self, url, opener=urllib_opener, ttl=None):
+        """ The response for url: from disk while it is fresh, revalidated
+            once it is stale, downloaded if we have never seen it
+
+        """
+        ttl = self.ttls.get(url_class(url), 0) if ttl is None else ttl
+        entry = self.entry(url)
+        if entry and time.time() - entry['checked'] < ttl:
+            logger.debug("fresh from cache: {}".format(url))
+            page = self.hit(url, entry)
+            if page:
+                return page
+
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last-modified'):
+            headers['If-Modified-Since'] = entry['last-modified']
+
+        status, respHeaders, body = opener(url, headers)
+        if status == 304 and entry:
+            logger.debug("not modified: {}".format(url))
+            entry['checked'] = time.time()
+            self.write_entry(url, entry)
+            page = self.hit(url, entry)
+            if page:
+                return page
+            # evicted under us; ask again without the validators
+            status, respHeaders, body = opener(url, {})
+
+        logger.debug("downloaded: {}".format(url))
+        self.store(url, status, respHeaders, body)
+        return CachedResponse(status, respHeaders, body)
+
+    def entry(self, url):
+        """ The json entry of url, or None (also if its body has gone) """
+        try:
+            with open(self.entry_path(url), 'r') as fIn:
+                entry = json.load(fIn)
+        except (IOError, ValueError):
+            return None
+        if not os.path.exists(self.body_path(entry['digest'])):
+            return None
+        return entry
+
+    def hit(self, url, entry):
+        """ The cached response of entry, or None if its body has gone """
+        try:
+            with open(self.body_path(entry['digest']), 'rb') as fIn:
+                body = fIn.read()
+        except IOError:
+            return None
+        try:
+            os.utime(self.entry_path(url), None)
+        except OSError:
+            pass
+        return CachedResponse(entry['status'], {'content-type': entry.get('content-type', '')},
+                              body, fromCache=True)
+
+    # Storing
+    def store(self, url, status, headers, body):
+        digest = hashlib.sha1(body).hexdigest()
+        path = self.body_path(digest)
+        new = not os.path.exists(path)
+        if new:
+            _atomic_write(path, body)
+        entry = {'url': url, 'status': status, 'digest': digest, 'size': len(body),
+                 'checked': time.time(), 'etag': headers.get('etag'),
+                 'last-modified': headers.get('last-modified'),
+                 'content-type': headers.get('content-type', '')}
+        self.write_entry(url, entry)
+
+        # only look through the whole cache once it may be too big
+        with self.lock:
+            if self.size is None:
+                bodyDir = os.path.join(self.root, 'bodies')
+                self.size = sum(os.path.getsize(os.path.join(bodyDir, d))
+                                for d in os.listdir(bodyDir))
+            elif new:
+                self.size += len(body)
+            full = self.size > self.maxBytes
+        if full:
+            self.evict()
+
+    def write_entry(self, url, entry):
+        _atomic_write(self.entry_path(url), json.dumps(entry))
+
+    def evict(self):
+        """ Drop the least recently used urls until the bodies fit in
+            maxBytes, then any body no url points at
+
+        """
+        with self.lock:
+            urlDir = os.path.join(self.root, 'urls')
+            entries = []
+            for name in os.listdir(urlDir):
+                path = os.path.join(urlDir, name)
+                try:
+                    with open(path, 'r') as fIn:
+                        entry = json.load(fIn)
+                    entries.append((os.path.getmtime(path), path, entry))
+                except (IOError, OSError, ValueError):
+                    continue
+
+            sizes = {e['digest']: e['size'] for (t, p, e) in entries}
+            total = sum(sizes.values())
+            refs = {}
+            for (t, p, e) in entries:
+                refs[e['digest']] = refs.get(e['digest'], 0) + 1
+
+            for (t, path, entry) in sorted(entries):
+                if total <= self.maxBytes:
+                    break
+                _remove(path)
+                refs[entry['digest']] -= 1
+                if not refs[entry['digest']]:
+                    total -= sizes[entry['digest']]
+                    logger.debug("evicted {}".format(entry['url']))
+
+            bodyDir = os.path.join(self.root, 'bodies')
+            for digest in os.listdir(bodyDir):
+                if not refs.get(digest) and not digest.endswith('.tmp'):
+                    _remove(os.path.join(bodyDir, digest))
+            self.size = total
+
+    def clear(self):
+        for d in ('urls', 'bodies'):
+            for name in os.listdir(os.path.join(self.root, d)):
+                _remove(os.path.join(self.root, d, name))
+        self.size = 0
+
+
+def _atomic_write(path, data):
+    tmp = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+    with open(tmp, 'wb') as fOut:
+        fOut.write(data)
+    os.rename(tmp, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
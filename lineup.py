@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: lineup.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    Optimal starting lineups for many rosters at once.
+
+    A set of players can start together exactly when they can be matched to
+    distinct slots they are eligible for, and by Hall's theorem that holds
+    when, for every set S of positions, the number of those players who only
+    play positions in S is no more than the number of slots open to some
+    position in S. Those sets of players form a matroid, so taking players
+    best first and keeping each one who still fits gives the best lineup;
+    flex slots no longer depend on the order they are filled in, and neither
+    do players eligible at several positions. The check is a small (rosters
+    x subsets) integer compare, so every roster moves through the greedy
+    pass together.
+
+    Players are described by their POS MASK (see playertable.py); inside
+    the solver that becomes a local mask with a bit per position in
+    self.positions.
+
+Usage:
+    solver = LineupSolver(parse_slots(['QB', 'RB', 'RB/WR', 'WR']), table)
+    values, starting = solver.solve(pts, masks)
+    assignment = solver.assign(masks[0][starting[0]])
+
+"""
+
+import numpy
+
+from playertable import position_bit
+
+
+#---------------------------#
+#   Slot definitions        #
+#---------------------------#
+
+def parse_slots(posList):
+    """ Turn a position list like POS_LIST into slot definitions: a list of
+        (slot name, [eligible positions]). Slash positions (other than D/ST)
+        are flex slots; (name, positions) tuples are passed through as is, so
+        e.g. two RB slots can be given as ('RB1', ['RB']), ('RB2', ['RB'])
+
+    """
+    slots = []
+    for pos in posList:
+        if isinstance(pos, tuple):
+            slots.append((pos[0], list(pos[1])))
+        elif '/' in pos and not pos == 'D/ST':
+            slots.append((pos, pos.split('/')))
+        else:
+            slots.append((pos, [pos]))
+    return slots
+
+
+#---------------------------#
+#   Solver                  #
+#---------------------------#
+
+class LineupSolver():
+    """ Best starting lineups for a fixed set of slot definitions """
+    def __init__(self, slots, table):
+        self.slots = slots
+        self.names = [name for (name, positions) in slots]
+
+        # the positions which can start anywhere, and their column in counts
+        self.positions = []
+        for (name, positions) in slots:
+            for p in positions:
+                if table.code('POS', p) >= 0 and p not in self.positions:
+                    self.positions.append(p)
+        self.bits = [position_bit(table.code('POS', p)) for p in self.positions]
+
+        # slot eligibility as a (slots x positions) matrix
+        self.eligible = numpy.zeros((len(slots), len(self.positions)), dtype=bool)
+        for (s, (name, positions)) in enumerate(slots):
+            for p in positions:
+                if p in self.positions:
+                    self.eligible[s, self.positions.index(p)] = True
+
+        # Hall's condition: one row per non-empty subset of positions, and
+        # the number of slots open to anyone in that subset
+        nPos = len(self.positions)
+        bits = numpy.arange(1, 2 ** nPos)
+        self.subsets = ((bits[:, None] >> numpy.arange(nPos)) & 1).astype(int)
+        self.capacity = (self.eligible.astype(int).dot(self.subsets.T) > 0).sum(axis=0)
+
+        # for every local mask m: which subsets it counts against (all of
+        # its positions are in the subset), and which slots it can fill
+        masks = numpy.arange(2 ** nPos)
+        self.contained = ((masks[:, None] & ~bits[None, :]) == 0).astype(int)
+        self.contained[0] = 0
+        self.slotOk = self.eligible.astype(int).dot(
+            (masks[None, :] >> numpy.arange(nPos)[:, None]) & 1) > 0
+
+    def local(self, masks):
+        """ Table POS MASKs as masks over self.positions (0: can not start) """
+        masks = numpy.asarray(masks)
+        out = numpy.zeros(masks.shape, dtype=int)
+        for (i, bit) in enumerate(self.bits):
+            out |= ((masks & bit) != 0).astype(int) << i
+        return out
+
+    def solve(self, pts, masks):
+        """ pts and masks (POS MASK) are (rosters x players) arrays, empty
+            roster spots having non-finite points. Returns the total starter
+            points of each roster and a boolean array of who starts
+
+        """
+        pts = numpy.asarray(pts, dtype=float)
+        local = self.local(masks)
+        nRosters, nPlayers = pts.shape
+        r = numpy.arange(nRosters)
+        order = numpy.argsort(-numpy.where(numpy.isfinite(pts), pts, -numpy.inf),
+                              axis=1, kind='mergesort')
+
+        load = numpy.zeros((nRosters, len(self.subsets)), dtype=int)
+        starting = numpy.zeros(pts.shape, dtype=bool)
+        for k in range(nPlayers):
+            cols = order[:, k]
+            m = local[r, cols]
+            valid = numpy.isfinite(pts[r, cols]) & (m > 0)
+
+            trial = load + self.contained[m]
+            fits = valid & (trial <= self.capacity).all(axis=1)
+
+            load[fits] = trial[fits]
+            starting[r[fits], cols[fits]] = True
+
+        values = numpy.where(starting, pts, 0.0).sum(axis=1)
+        return values, starting
+
+    def values(self, pts, masks):
+        return self.solve(pts, masks)[0]
+
+    def load(self, masks):
+        """ The (subsets) load of a set of starters, by POS MASK """
+        return self.contained[self.local(masks)].sum(axis=0)
+
+    def fits(self, load):
+        """ load is a (rosters x subsets) array of the starters each roster
+            has (see load). Returns a (rosters x local masks) boolean array:
+            could one more player with that local mask still start? Column 0
+            (no position in the lineup) is always False
+
+        """
+        load = numpy.asarray(load)
+        if not len(self.subsets):
+            # no slots: nobody can start
+            return numpy.zeros((len(load), 1), dtype=bool)
+
+        # rosters mostly share a handful of loads; check each once
+        uniq, inverse = numpy.unique(load, axis=0, return_inverse=True)
+        ok = ((uniq[:, None, :] + self.contained[None, :, :]) <= self.capacity).all(axis=2)
+        ok[:, 0] = False
+        return ok[inverse]
+
+    def assign(self, masks):
+        """ Place a set of players who can all start (POS MASKs, best first)
+            into slots. Returns a list with the slot index of each player.
+            Augmenting paths, trying single position slots before flex ones
+
+        """
+        local = self.local(masks)
+        byWidth = sorted(range(len(self.slots)), key=lambda s: self.eligible[s].sum())
+        holder = {}
+
+        def place(i, seen):
+            for s in byWidth:
+                if s not in seen and self.slotOk[s, local[i]]:
+                    seen.add(s)
+                    if s not in holder or place(holder[s], seen):
+                        holder[s] = i
+                        return True
+            return False
+
+        for i in range(len(local)):
+            if local[i] == 0 or not place(i, set()):
+                raise ValueError("these players can not all start")
+
+        slotOf = [None] * len(local)
+        for (s, i) in holder.items():
+            slotOf[i] = s
+        return slotOf
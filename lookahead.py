@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: lookahead.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    "What do I lose by waiting?" Rank the free agents by the points I expect
+    to give up if I pass on them now and take the best survivor at their
+    position on my next turn, instead of by raw replacement value.
+
+    The expensive part is done once: a Monte Carlo of noisy RNK (or ADP)
+    boards, the same model draftsim uses, gives every plausibly draftable
+    player a distribution over the overall pick he goes at. After each pick
+    the survival odds to my next turn are a lookup into that distribution
+    (conditioned on him having lasted this long), and the expected losses
+    are a few prefix sums per position over the top of the pool index.
+
+Usage:
+    la = LookaheadService(dd, 'HPZ', ffldraft.DRAFT_ORDER)
+    la.top(10)      # refreshed automatically after every been_drafted
+
+"""
+
+import numpy
+
+from draftsim import POOL_FACTOR, ROUNDS, SIGMA, snake_order
+from playertable import FA_CODE
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+N_RUNS = 500
+DEPTH = 50
+
+
+#---------------------------#
+#   Lookahead service       #
+#---------------------------#
+
+class LookaheadService():
+    """ Expected loss from waiting until my next pick, kept up to date as
+        players are drafted
+
+    """
+    def __init__(self, draftData, myTeam, teamOrder, rounds=ROUNDS,
+                 sigma=SIGMA, nRuns=N_RUNS, depth=DEPTH, seed=None):
+        self.draftData = draftData
+        self.table = draftData.table
+        self.myTeam = myTeam
+        self.order = snake_order(teamOrder, rounds)
+        self.depth = depth
+
+        self.precompute(sigma, nRuns, seed)
+        self.refresh()
+        draftData.listeners.append(self.on_pick)
+
+    def precompute(self, sigma=SIGMA, nRuns=N_RUNS, seed=None):
+        """ For the best ranked POOL_FACTOR x (all picks) players, estimate
+            gone[i, m], the chance player i has been taken before overall
+            pick m
+
+        """
+        nPicks = len(self.order)
+        rank = self.table['ADP' if 'ADP' in self.table else 'RNK'].astype(float)
+        pool = numpy.argsort(rank, kind='mergesort')[:POOL_FACTOR * nPicks]
+
+        rng = numpy.random.RandomState(seed)
+        noisy = rank[pool] * numpy.exp(sigma * rng.standard_normal((nRuns, len(pool))))
+        slot = numpy.argsort(numpy.argsort(noisy, axis=1), axis=1)
+
+        # histogram of the pick each player goes at (past the end of the
+        # draft counts as undrafted), with add-one smoothing so nobody is
+        # ever certain to be gone
+        hist = numpy.ones((len(pool), nPicks + 1))
+        numpy.add.at(hist, (numpy.arange(len(pool))[None, :], numpy.minimum(slot, nPicks)), 1)
+        cum = numpy.cumsum(hist, axis=1) / hist.sum(axis=1)[:, None]
+        self.gone = numpy.hstack([numpy.zeros((len(pool), 1)), cum])
+
+        # map table rows into gone; everyone else always survives
+        self.poolRow = numpy.full(len(self.table), -1, dtype=int)
+        self.poolRow[pool] = numpy.arange(len(pool))
+
+    def turns(self):
+        """ (the pick we are at, my next pick after it), as overall indices.
+            Past the end of the schedule (a league with deeper rosters than
+            rounds) both are the end, so everyone left survives
+
+        """
+        current = min(int((self.table['F TEAM'] != FA_CODE).sum()), len(self.order))
+        later = [i for i in range(current + 1, len(self.order))
+                 if self.order[i] == self.myTeam]
+        return current, (later[0] if later else len(self.order))
+
+    def survival(self, rows, current, horizon):
+        """ Chance each player in rows is still there at pick horizon, given
+            he has lasted to pick current
+
+        """
+        i = self.poolRow[rows]
+        inPool = i >= 0
+        s = numpy.ones(len(rows))
+        s[inPool] = ((1.0 - self.gone[i[inPool], horizon])
+                     / (1.0 - self.gone[i[inPool], current]))
+        return numpy.clip(s, 0.0, 1.0)
+
+    def on_pick(self, players, teamName):
+        self.refresh()
+
+    def refresh(self):
+        """ Recompute the ranking. For a position with free agents best first
+            (points p, survival s), the expected points of the best survivor
+            if player i is gone is sum over j != i of p_j s_j prod_{l<j, l!=i}
+            (1 - s_l). With w_j = p_j s_j prod_{l<j} (1 - s_l), the expected
+            loss of waiting on i, (1 - s_i) (p_i - that), is
+
+                (1 - s_i) (p_i - sum_{j<i} w_j) - sum_{j>i} w_j
+
+            so every position is a couple of cumulative sums
+
+        """
+        current, horizon = self.turns()
+        byPos = self.draftData.pool.top_n_by_position(self.depth, isFA=True)
+
+        rows, survival, loss = [], [], []
+        for posRows in byPos.values():
+            posRows = numpy.array(posRows, dtype=int)
+            pts = self.table['PTS'][posRows].astype(float)
+            s = self.survival(posRows, current, horizon)
+
+            before = numpy.concatenate([[1.0], numpy.cumprod(1.0 - s)[:-1]])
+            w = pts * s * before
+            above = numpy.cumsum(w) - w
+            below = w.sum() - numpy.cumsum(w)
+
+            rows.append(posRows)
+            survival.append(s)
+            loss.append((1.0 - s) * (pts - above) - below)
+
+        if rows:
+            rows, survival, loss = [numpy.concatenate(x) for x in (rows, survival, loss)]
+        else:
+            rows, survival, loss = numpy.zeros(0, dtype=int), numpy.zeros(0), numpy.zeros(0)
+
+        # a player at several positions is ranked by the smallest loss
+        ascending = numpy.argsort(loss, kind='mergesort')
+        keep = ascending[numpy.unique(rows[ascending], return_index=True)[1]]
+        rows, survival, loss = rows[keep], survival[keep], loss[keep]
+
+        order = numpy.argsort(-loss, kind='mergesort')
+        self.rows = rows[order]
+        self.survivalOdds = survival[order]
+        self.waitLoss = loss[order]
+        self.turn = (current, horizon)
+
+    def top(self, N=None):
+        """ The N free agents it hurts most to wait on, as player dicts with
+            'survival' and 'wait_loss' added
+
+        """
+        recs = self.table.records(self.rows[:N])
+        for (rec, s, l) in zip(recs, self.survivalOdds, self.waitLoss):
+            rec['survival'] = s
+            rec['wait_loss'] = l
+        return recs
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: picktimer.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    Where does the time go after a pick? A StageTimer times named stages of
+    each pick (moving the player, the log, listeners, replacement curves,
+    top n, team summaries, drawing), keeps the last WINDOW timings of every
+    stage in a ring buffer, and can turn them into histograms or a summary.
+    Every LOG_EVERY picks it writes a one line summary to the log.
+
+    Disabled (the default), stage() hands back one shared do-nothing context
+    manager, so the instrumentation costs a method call per stage.
+
+Usage:
+    dd = ffldraft.DraftData(timing=True)
+    ...
+    dd.timer.summary()              # {stage: {'n', 'mean', 'p50', 'p95', 'max'}}
+    dd.timer.histogram('summary')   # (counts, bin edges) in seconds
+
+"""
+
+from timeit import default_timer
+
+import numpy
+
+import zachlog
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+WINDOW = 512
+LOG_EVERY = 12
+
+# log spaced histogram bins, from 10 microseconds to 10 seconds
+BIN_EDGES = numpy.logspace(-5, 1, 25)
+
+logger = zachlog.getLogger(__name__)
+
+
+#---------------------------#
+#   Stage timer             #
+#---------------------------#
+
+class _Nothing():
+    """ The context manager handed out while timing is off """
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NOTHING = _Nothing()
+
+
+class _Stage():
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = default_timer()
+        return self
+
+    def __exit__(self, *exc):
+        self.timer.record(self.name, default_timer() - self.t0)
+        return False
+
+
+class StageTimer():
+    """ Rolling timings of the stages of a pick """
+    def __init__(self, enabled=False, window=WINDOW, logEvery=LOG_EVERY):
+        self.enabled = enabled
+        self.window = window
+        self.logEvery = logEvery
+        self.reset()
+
+    def reset(self):
+        self.samples = {}
+        self.counts = {}
+        self.order = []
+        self.picks = 0
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    # Recording
+    def stage(self, name):
+        """ A context manager timing the code inside it as stage name """
+        if not self.enabled:
+            return _NOTHING
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        if name not in self.samples:
+            self.samples[name] = numpy.zeros(self.window)
+            self.counts[name] = 0
+            self.order.append(name)
+        self.samples[name][self.counts[name] % self.window] = seconds
+        self.counts[name] += 1
+
+    def pick_done(self):
+        """ Call once a pick is finished; every logEvery picks the summary
+            is logged
+
+        """
+        if not self.enabled:
+            return
+        self.picks += 1
+        if self.logEvery and self.picks % self.logEvery == 0:
+            logger.info(self.summary_line())
+
+    # Reading
+    def timings(self, name):
+        """ The timings (seconds) of stage name still in the window """
+        return self.samples[name][:min(self.counts[name], self.window)]
+
+    def histogram(self, name, bins=BIN_EDGES):
+        """ (counts, bin edges) of the timings of stage name in the window """
+        return numpy.histogram(self.timings(name), bins)
+
+    def summary(self):
+        """ A dict of stage: {'n', 'mean', 'p50', 'p95', 'max'} seconds over
+            the window
+
+        """
+        out = {}
+        for name in self.order:
+            t = self.timings(name)
+            p50, p95 = numpy.percentile(t, [50, 95])
+            out[name] = {'n': self.counts[name], 'mean': t.mean(), 'p50': p50,
+                         'p95': p95, 'max': t.max()}
+        return out
+
+    def summary_line(self):
+        summary = self.summary()
+        return "pick timings over the last {} picks (p50/p95 ms): {}".format(
+            min(self.picks, self.window),
+            ', '.join('{} {:.2f}/{:.2f}'.format(name, 1e3 * s['p50'], 1e3 * s['p95'])
+                      for (name, s) in [(n, summary[n]) for n in self.order]))
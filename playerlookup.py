@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: playerlookup.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    Lookup indexes for finding players in a PlayerTable by what a human types
+    in (first / last name prefixes) or by what a draft results file contains
+    (full names), without scanning the whole pool for every pick
+
+    A full name is matched exactly (up to case and spacing) if anyone has
+    it, and only otherwise by its normalized form, so "Steve Smith" does not
+    also find "Steve Smith Sr.". A position (picks files have one) tells
+    apart players who share a name, like the QB and TE Ryan Griffin.
+
+Usage:
+    lookup = PlayerLookup(table)
+    lookup.by_initials('a', 'p')            # rows, best ranked first
+    lookup.by_name('Adrian', 'Peterson')    # rows
+    lookup.by_name('Ryan', 'Griffin', 'TE')
+
+"""
+
+import re
+
+import numpy
+
+from playertable import POS_MASK, position_bit
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+NAME_SUFFIXES = {'jr', 'sr', 'ii', 'iii', 'iv', 'v'}
+_RE_PUNCT = re.compile(r"[.,'\-]")
+
+
+#---------------------------#
+#   Name normalization      #
+#---------------------------#
+
+def exact_name(first, last=''):
+    """ A name as written, with only case and spacing evened out """
+    return ' '.join('{} {}'.format(first, last).lower().split())
+
+
+def normalize_name(first, last=''):
+    """ Lower-case a name, drop punctuation and generational suffixes so that
+        e.g. "Odell Beckham Jr." and "odell beckham" collide
+
+    """
+    words = _RE_PUNCT.sub(' ', '{} {}'.format(first, last).lower()).split()
+    while len(words) > 1 and words[-1] in NAME_SUFFIXES:
+        words.pop()
+    return ' '.join(words)
+
+
+#---------------------------#
+#   Prefix trie             #
+#---------------------------#
+
+class PrefixTrie():
+    """ A character trie where every node holds the rows of all the words
+        underneath it, in insertion order. Finding everyone whose name starts
+        with a prefix is a walk of len(prefix) nodes
+
+    """
+    def __init__(self):
+        self.root = ({}, [])
+
+    def insert(self, word, row):
+        children, rows = self.root
+        rows.append(row)
+        for ch in word.lower():
+            children, rows = children.setdefault(ch, ({}, []))
+            rows.append(row)
+
+    def find(self, prefix):
+        """ Rows of all words starting with prefix (case insensitive) """
+        children, rows = self.root
+        for ch in prefix.lower():
+            try:
+                children, rows = children[ch]
+            except KeyError:
+                return []
+        return rows
+
+
+#---------------------------#
+#   Player lookup           #
+#---------------------------#
+
+class PlayerLookup():
+    """ Index a PlayerTable by first/last name prefix and by full name """
+    def __init__(self, table):
+        self.table = table
+        self.firstTrie = PrefixTrie()
+        self.lastTrie = PrefixTrie()
+        self.exact = {}
+        self.names = {}
+
+        # insert in rank order so every trie node is already sorted by RNK
+        first = table['FIRST']
+        last = table['LAST']
+        for row in numpy.argsort(table['RNK'], kind='mergesort'):
+            self.firstTrie.insert(first[row], row)
+            self.lastTrie.insert(last[row], row)
+            self.exact.setdefault(exact_name(first[row], last[row]), []).append(row)
+            self.names.setdefault(normalize_name(first[row], last[row]), []).append(row)
+
+    def by_initials(self, firstPrefix='', lastPrefix=''):
+        """ Rows of players whose first and last names start with the given
+            prefixes, best ranked first
+
+        """
+        firstRows = self.firstTrie.find(firstPrefix)
+        lastRows = self.lastTrie.find(lastPrefix)
+        if len(lastRows) < len(firstRows):
+            keep = set(lastRows)
+            return [r for r in firstRows if r in keep]
+        else:
+            keep = set(firstRows)
+            return [r for r in lastRows if r in keep]
+
+    def by_name(self, first, last='', pos=None):
+        """ Rows of players with this name, best ranked first: the exact
+            matches if there are any, else the normalized ones. With pos,
+            only those eligible at pos (unless none of them are)
+
+        """
+        rows = (self.exact.get(exact_name(first, last))
+                or self.names.get(normalize_name(first, last), []))
+        if pos is not None and len(rows) > 1:
+            bit = position_bit(self.table.code('POS', pos.strip()))
+            masks = self.table[POS_MASK]
+            rows = [r for r in rows if masks[r] & bit] or rows
+        return list(rows)
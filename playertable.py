@@ -0,0 +1,320 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: playertable.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    A columnar home for the player projection table. Every field is one numpy
+    array, and the categorical fields (POS, TEAM, F TEAM) are interned into
+    integer codes, so filtering the pool is a handful of integer compares
+    instead of a walk over a list of dicts.
+
+    A player listed at more than one position ("RB, WR") is one row: POS
+    holds the first position listed, and POS MASK has a bit set for every
+    position he can play (bit c for POS code c).
+
+Usage:
+    table = PlayerTable.from_records(listOfPlayerDicts)
+    draft = table.freeze().overlay()        # per-draft F TEAM, shared the rest
+    fa = draft.mask(pos='RB', isFA=True)     # anyone who can play RB
+    best = draft.records(draft.by_points(fa)[:10])
+
+"""
+
+import numpy
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+CATEGORICAL_FIELDS = ['POS', 'TEAM', 'F TEAM']
+FREE_AGENT = 'FA'
+FA_CODE = 0
+IDX = 'IDX'
+
+POS_MASK = 'POS MASK'
+POS_SEP = ','
+
+# the only field a draft writes to; everything else is projections
+OVERLAY_FIELDS = ['F TEAM']
+FTEAM_DTYPE = 'int16'
+
+
+#---------------------------#
+#   Categorical codes       #
+#---------------------------#
+
+class Interner():
+    """ Map string labels to small integer codes and back again. Codes are
+        handed out in order of first appearance and never change, so they are
+        safe to store in the columns
+
+    """
+    def __init__(self, labels=()):
+        self.labels = []
+        self.codes = {}
+        for label in labels:
+            self.intern(label)
+
+    def __len__(self):
+        return len(self.labels)
+
+    def intern(self, label):
+        """ Return the code for label, creating one if it is new """
+        try:
+            return self.codes[label]
+        except KeyError:
+            code = len(self.labels)
+            self.codes[label] = code
+            self.labels.append(label)
+            return code
+
+    def code(self, label):
+        """ Return the code for label, or -1 if we have never seen it """
+        return self.codes.get(label, -1)
+
+    def label(self, code):
+        return self.labels[code]
+
+    def encode(self, labels):
+        return numpy.array([self.intern(l) for l in labels], dtype='int32')
+
+    def decode(self, codes):
+        return [self.labels[c] for c in codes]
+
+    def sort_rank(self):
+        """ An array mapping code -> alphabetical rank of its label, for when
+            we need to order by the label rather than the code
+
+        """
+        rank = numpy.empty(len(self.labels), dtype='int32')
+        rank[numpy.argsort(numpy.array(self.labels, dtype=object))] = numpy.arange(len(self.labels))
+        return rank
+
+
+def split_positions(label):
+    """ The positions of a POS cell, e.g. 'RB, WR' -> ['RB', 'WR'] """
+    return [p.strip() for p in label.split(POS_SEP) if p.strip()] or ['']
+
+
+def encode_positions(interner, labels):
+    """ POS codes (the first position listed) and POS MASK bits for a list
+        of POS cells
+
+    """
+    codes = numpy.empty(len(labels), dtype='int32')
+    masks = numpy.zeros(len(labels), dtype='int64')
+    for (i, label) in enumerate(labels):
+        positions = [interner.intern(p) for p in split_positions(label)]
+        codes[i] = positions[0]
+        for c in positions:
+            masks[i] |= 1 << c
+    return codes, masks
+
+
+def position_bit(code):
+    """ The POS MASK bit of a POS code (0 for unknown positions) """
+    return 1 << code if code >= 0 else 0
+
+
+#---------------------------#
+#   Player table            #
+#---------------------------#
+
+class PlayerTable():
+    """ Columnar player table: one numpy array per field, categorical fields
+        stored as Interner codes
+
+    """
+    def __init__(self, columns, fields=None, categories=None):
+        self.columns = columns
+        self.fields = list(fields) if fields else sorted(columns.keys())
+        self.categories = categories or {}
+
+        # free agents always get code 0 in the fantasy team column
+        fteams = self.categories.setdefault('F TEAM', Interner())
+        if fteams.intern(FREE_AGENT) != FA_CODE:
+            raise ValueError("F TEAM categories must start with {}".format(FREE_AGENT))
+
+        # tables without a position mask: everyone plays only their POS
+        if 'POS' in self.columns and POS_MASK not in self.columns:
+            self.add_column(POS_MASK, numpy.left_shift(1, self.columns['POS'].astype('int64')))
+
+    @classmethod
+    def from_records(cls, records, categorical=CATEGORICAL_FIELDS):
+        """ Build a table out of a list of player dicts """
+        fields = []
+        for rec in records:
+            for f in rec:
+                if f not in fields:
+                    fields.append(f)
+
+        columns = {}
+        categories = {}
+        for f in fields:
+            vals = [rec.get(f) for rec in records]
+            if f == 'POS' and f in categorical:
+                categories[f] = Interner()
+                columns[f], columns[POS_MASK] = encode_positions(categories[f], vals)
+            elif f in categorical:
+                categories[f] = Interner([FREE_AGENT] if f == 'F TEAM' else [])
+                columns[f] = categories[f].encode(vals)
+            else:
+                columns[f] = _typed_array(vals)
+
+        if POS_MASK in columns and POS_MASK not in fields:
+            fields.append(POS_MASK)
+
+        return cls(columns, fields, categories)
+
+    def __len__(self):
+        return len(self.columns[self.fields[0]]) if self.fields else 0
+
+    def __getitem__(self, field):
+        return self.columns[field]
+
+    def __contains__(self, field):
+        return field in self.columns
+
+    # Sharing between drafts
+    def freeze(self):
+        """ Make every column read only, so the table can be shared by any
+            number of drafts (see overlay). Returns the table
+
+        """
+        for col in self.columns.values():
+            col.flags.writeable = False
+        return self
+
+    def overlay(self, fields=OVERLAY_FIELDS):
+        """ A table for one draft on top of this (frozen) one: the columns
+            and categories are shared, except for fields, which get their own
+            copy. For the default F TEAM that is a couple of bytes a player
+            plus the draft's own team labels
+
+        """
+        columns = dict(self.columns)
+        categories = dict(self.categories)
+        for f in fields:
+            if f == 'F TEAM':
+                columns[f] = self.columns[f].astype(FTEAM_DTYPE)
+            else:
+                columns[f] = self.columns[f].copy()
+            if f in categories:
+                categories[f] = Interner(categories[f].labels)
+        return PlayerTable(columns, self.fields, categories)
+
+    def add_column(self, field, values):
+        if field not in self.columns:
+            self.fields.append(field)
+        self.columns[field] = values
+
+    def code(self, field, label):
+        return self.categories[field].code(label)
+
+    def label(self, field, code):
+        return self.categories[field].label(code)
+
+    def labels_in_use(self, field, mask=None):
+        """ The sorted labels of a categorical field which appear in the table
+            (or the masked part of it)
+
+        """
+        codes = self.columns[field] if mask is None else self.columns[field][mask]
+        return sorted(self.categories[field].decode(numpy.unique(codes)))
+
+    # Positions
+    def positions(self, row):
+        """ The POS codes the player at row is eligible for, his POS first """
+        first = int(self.columns['POS'][row])
+        mask = int(self.columns[POS_MASK][row])
+        return [first] + [c for c in range(len(self.categories['POS']))
+                          if c != first and mask >> c & 1]
+
+    def position_labels(self, row):
+        return [self.label('POS', c) for c in self.positions(row)]
+
+    def eligibility(self, idx=None):
+        """ (rows, POS codes): one entry per position every player in idx
+            (default everyone) is eligible for
+
+        """
+        idx = numpy.arange(len(self)) if idx is None else numpy.asarray(idx, dtype=int)
+        masks = self.columns[POS_MASK][idx]
+        rows, codes = [], []
+        for c in range(len(self.categories['POS'])):
+            at = idx[masks >> c & 1 == 1]
+            rows.append(at)
+            codes.append(numpy.full(len(at), c, dtype=int))
+        return numpy.concatenate(rows), numpy.concatenate(codes)
+
+    # Filtering and ordering
+    def mask(self, pos=None, isFA=None, onTeam=None):
+        """ Boolean mask of the players eligible at pos, who are (not) free
+            agents, and/or who are on the fantasy team onTeam
+
+        """
+        m = numpy.ones(len(self), dtype=bool)
+        if pos is not None:
+            m &= self.columns[POS_MASK] & position_bit(self.code('POS', pos)) != 0
+        if isFA is not None:
+            m &= (self.columns['F TEAM'] == FA_CODE) == isFA
+        if onTeam is not None:
+            m &= self.columns['F TEAM'] == self.code('F TEAM', onTeam)
+        return m
+
+    def draft_order(self, mask=None):
+        """ Indices sorted by fantasy team, then position (both by label), then
+            descending points
+
+        """
+        idx = numpy.arange(len(self)) if mask is None else numpy.flatnonzero(mask)
+        fteamRank = self.categories['F TEAM'].sort_rank()[self.columns['F TEAM'][idx]]
+        posRank = self.categories['POS'].sort_rank()[self.columns['POS'][idx]]
+        return idx[numpy.lexsort((-self.columns['PTS'][idx], posRank, fteamRank))]
+
+    def by_points(self, mask=None):
+        """ Indices sorted by descending points, ties broken by draft order """
+        idx = self.draft_order(mask)
+        return idx[numpy.argsort(-self.columns['PTS'][idx], kind='mergesort')]
+
+    # Updates
+    def set_fteam(self, idx, teamName):
+        self.columns['F TEAM'][idx] = self.categories['F TEAM'].intern(teamName)
+
+    # Materializing rows
+    def records(self, idx=None):
+        """ Return the rows at idx as a list of player dicts (decoded, with the
+            row index stored under IDX)
+
+        """
+        idx = numpy.arange(len(self)) if idx is None else numpy.asarray(idx, dtype=int)
+        cols = []
+        for f in self.fields:
+            vals = self.columns[f][idx]
+            if f in self.categories:
+                cols.append(self.categories[f].decode(vals))
+            else:
+                cols.append(vals.tolist())
+        cols.append(idx.tolist())
+        keys = self.fields + [IDX]
+        return [dict(zip(keys, row)) for row in zip(*cols)]
+
+    def record(self, i):
+        return self.records([i])[0]
+
+
+def _typed_array(vals):
+    """ Pick the narrowest of int / float / object which holds vals """
+    if all(isinstance(v, (int, long)) for v in vals):
+        return numpy.array(vals, dtype='int64')
+    elif all(isinstance(v, (int, long, float)) for v in vals):
+        return numpy.array(vals, dtype='float64')
+    else:
+        arr = numpy.empty(len(vals), dtype=object)
+        arr[:] = vals
+        return arr
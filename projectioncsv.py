@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: projectioncsv.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    Load an ESPN projection csv straight into a PlayerTable. Rather than
+    guessing the type of every cell, the columns are declared up front (in
+    the spirit of CSV_DTYPE in FFLDraft.py): the rows are read with the C csv
+    reader and transposed, and every numeric column is parsed by a single
+    numpy call instead of a try-int, try-float per cell.
+
+    The ESPN header repeats YDS and TD for passing, rushing and receiving;
+    repeated headers are told apart by where they appear (PASS YDS, RUSH YDS,
+    REC YDS, ...). The composite fields are split: "Team Pos" into TEAM and
+    POS, "Player" into FIRST and LAST, and "C/A" into C and A. Files which
+    already have those columns split (getdraftdata.py output) load as is.
+
+    Players at more than one position are one row with a POS like "RB, WR"
+    (see playertable.POS_MASK). Files written before that have a copy of
+    the player per position; copies which match in everything but POS are
+    merged back into one row.
+
+Usage:
+    table = load_projection_csv('ffl_data_20140901.csv')
+
+"""
+
+import csv
+
+import numpy
+
+import zachlog
+
+from playertable import (CATEGORICAL_FIELDS, FREE_AGENT, POS_MASK, POS_SEP,
+                         Interner, PlayerTable, encode_positions, split_positions)
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+# bump when the columns produced for a given file change (invalidates caches)
+SCHEMA_VERSION = 2
+
+COLUMN_DTYPE = [
+    ('RNK', 'int64'),
+    ('FIRST', object),
+    ('LAST', object),
+    ('C', 'int64'),
+    ('A', 'int64'),
+    ('PASS YDS', 'int64'),
+    ('PASS TD', 'int64'),
+    ('INT', 'int64'),
+    ('RUSH', 'int64'),
+    ('RUSH YDS', 'int64'),
+    ('RUSH TD', 'int64'),
+    ('REC', 'int64'),
+    ('REC YDS', 'int64'),
+    ('REC TD', 'int64'),
+    ('PTS', 'float64'),
+]
+
+REPEATED_HEADERS = {
+    'YDS': ['PASS YDS', 'RUSH YDS', 'REC YDS'],
+    'TD': ['PASS TD', 'RUSH TD', 'REC TD'],
+}
+
+# cells which mean "no projection"
+MISSING = ['--', '']
+
+logger = zachlog.getLogger(__name__)
+
+
+#---------------------------#
+#   Loading                 #
+#---------------------------#
+
+def load_projection_csv(datafile, dtype=COLUMN_DTYPE):
+    """ Parse the projection csv datafile into a PlayerTable """
+    with open(datafile, 'rb') as fIn:
+        reader = csv.reader(fIn)
+        header = [h.strip() for h in next(reader)]
+        rows = list(reader)
+    nRows = len(rows)
+    rows = [row for row in rows if len(row) == len(header)]
+    if len(rows) < nRows:
+        logger.warning("skipped {} rows of {} with the wrong number of fields".format(
+            nRows - len(rows), datafile))
+    logger.debug("read {} rows of {}".format(len(rows), datafile))
+
+    cells = zip(*rows) if rows else [()] * len(header)
+    fields = []
+    columns = {}
+    for (name, col) in zip(column_names(header), cells):
+        split = COMPOSITE_FIELDS.get(name)
+        for (f, vals) in (split(col) if split else [(name, col)]):
+            fields.append(f)
+            columns[f] = vals
+
+    if 'POS' in columns:
+        _merge_positions(columns, fields, datafile)
+
+    dtype = dict(dtype)
+    categories = {}
+    for f in fields:
+        if f == 'POS':
+            categories[f] = Interner()
+            columns[f], columns[POS_MASK] = encode_positions(categories[f], columns[f])
+        elif f in CATEGORICAL_FIELDS:
+            categories[f] = Interner([FREE_AGENT] if f == 'F TEAM' else [])
+            columns[f] = categories[f].encode([c.strip() for c in columns[f]])
+        else:
+            columns[f] = convert(columns[f], dtype.get(f), f)
+
+    if POS_MASK in columns:
+        fields.append(POS_MASK)
+
+    return PlayerTable(columns, fields, categories)
+
+
+def _merge_positions(columns, fields, datafile=None):
+    """ Fold rows which differ only in POS into the first of them, with
+        all of their positions. Works on the raw string columns, in place
+
+    """
+    others = [columns[f] for f in fields if f != 'POS']
+    if not others:
+        return
+    first = {}
+    keep = []
+    pos = [p.strip() for p in columns['POS']]
+    for (i, key) in enumerate(zip(*others)):
+        if key in first:
+            j = first[key]
+            if pos[i] not in split_positions(pos[j]):
+                pos[j] = '{}{} {}'.format(pos[j], POS_SEP, pos[i])
+        else:
+            first[key] = i
+            keep.append(i)
+
+    if len(keep) < len(pos):
+        logger.info("merged {} extra position rows of {}".format(len(pos) - len(keep), datafile))
+    for f in fields:
+        col = pos if f == 'POS' else columns[f]
+        columns[f] = [col[i] for i in keep]
+
+
+def column_names(header):
+    """ The field name of every column, telling repeated headers apart by
+        the order they come in
+
+    """
+    seen = {}
+    for h in header:
+        seen[h] = seen.get(h, 0) + 1
+
+    names = []
+    count = {}
+    for h in header:
+        i = count.get(h, 0)
+        count[h] = i + 1
+        if seen[h] > 1 and h in REPEATED_HEADERS and i < len(REPEATED_HEADERS[h]):
+            names.append(REPEATED_HEADERS[h][i])
+        else:
+            names.append(h)
+    return names
+
+
+def convert(col, dtype=None, field=None):
+    """ Convert a column of strings to dtype, widening ints to floats if
+        need be. Without a declared dtype try int, float, and otherwise keep
+        the (stripped) strings
+
+    """
+    if dtype is object:
+        return _object_array([c.strip() for c in col])
+
+    vals = _parse_numbers(col)
+    if vals is not None:
+        if dtype in (None, 'int64'):
+            return vals.astype('int64') if (vals == numpy.round(vals)).all() else vals
+        return vals.astype(dtype)
+
+    if dtype:
+        raise ValueError("column {} is not {}".format(field, dtype))
+    return _object_array([c.strip() for c in col])
+
+
+def _parse_numbers(col):
+    """ Parse a whole column of number strings at once (as floats), or
+        return None if some cell is not a number
+
+    """
+    text = ','.join(col).replace('--', '0')
+    try:
+        vals = numpy.fromstring(text, dtype='float64', sep=',') if col else numpy.zeros(0)
+    except ValueError:
+        vals = None
+    if vals is not None and len(vals) == len(col) and numpy.isfinite(vals).all():
+        return vals
+
+    # blanks, or something fromstring choked on: cell by cell
+    try:
+        return numpy.array([float(c) if c.strip() not in MISSING else 0.0
+                            for c in col], dtype='float64')
+    except ValueError:
+        return None
+
+
+def _object_array(vals):
+    arr = numpy.empty(len(vals), dtype=object)
+    arr[:] = vals
+    return arr
+
+
+#---------------------------#
+#   Composite fields        #
+#---------------------------#
+
+def _partition(col, sep):
+    parts = [c.strip().partition(sep) for c in col]
+    return [p[0] for p in parts], [p[2].strip() for p in parts]
+
+
+def _split_team_pos(col):
+    team, pos = _partition(col, ' ')
+    return [('TEAM', team), ('POS', pos)]
+
+
+def _split_player(col):
+    first, last = _partition(col, ' ')
+    return [('FIRST', first), ('LAST', last)]
+
+
+def _split_comp_att(col):
+    comp, att = _partition(col, '/')
+    return [('C', comp), ('A', att)]
+
+
+COMPOSITE_FIELDS = {
+    'Team Pos': _split_team_pos,
+    'Player': _split_player,
+    'C/A': _split_comp_att,
+}
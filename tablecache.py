@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+module: tablecache.py
+author: Zach Lamberty
+created: 2026-10-18
+
+Description:
+    A binary cache of the parsed player table, so a warm start never looks at
+    the csv again. The cleaned, typed columns are written side by side as one
+    structured .npy next to the data file, with a small json file holding the
+    field order, the categorical labels and the key (path, size and mtime) of
+    the csv it was built from. A matching cache is memory-mapped read only,
+    so every process working off the same data file shares its pages (a
+    draft writes to its own overlay, see PlayerTable.overlay).
+
+Usage:
+    table = cached_table('ffl_data_20140901.csv', parse)    # parse(path) -> PlayerTable
+
+"""
+
+import json
+import os
+import threading
+
+import numpy
+
+import zachlog
+
+from playertable import Interner, PlayerTable
+
+
+#---------------------------#
+#   Module Constants        #
+#---------------------------#
+
+CACHE_EXT = '.cache'
+
+logger = zachlog.getLogger(__name__)
+
+
+#---------------------------#
+#   Cache files             #
+#---------------------------#
+
+def cache_paths(datafile):
+    """ The (array, meta) cache files belonging to datafile """
+    base = datafile + CACHE_EXT
+    return base + '.npy', base + '.json'
+
+
+def source_key(datafile, version=None):
+    """ What a cache has to match: the data file, and the version of the
+        parser which built it
+
+    """
+    st = os.stat(datafile)
+    return {'path': os.path.realpath(datafile), 'size': st.st_size,
+            'mtime': st.st_mtime, 'version': version}
+
+
+def cached_table(datafile, parse, version=None):
+    """ The PlayerTable for datafile, from the cache if it is still fresh,
+        otherwise parse(datafile) (which is then cached for next time).
+        Changing version invalidates existing caches
+
+    """
+    key = source_key(datafile, version)
+    table = load(datafile, key)
+    if table is None:
+        table = parse(datafile)
+        try:
+            save(datafile, table, key)
+        except (IOError, OSError, ValueError) as e:
+            logger.warning("could not cache {}: {}".format(datafile, e))
+    return table
+
+
+def load(datafile, key=None):
+    """ The cached PlayerTable for datafile, or None if there is no cache or
+        it was built from a different version of the file
+
+    """
+    arrPath, metaPath = cache_paths(datafile)
+    key = key or source_key(datafile)
+    try:
+        with open(metaPath, 'r') as fIn:
+            meta = json.load(fIn)
+    except (IOError, ValueError):
+        return None
+    if meta['key'] != key:
+        logger.debug("cache for {} is stale".format(datafile))
+        return None
+
+    try:
+        arr = numpy.load(arrPath, mmap_mode='r')
+    except (IOError, ValueError):
+        return None
+
+    fields = _native(meta['fields'])
+    columns = {}
+    for f in fields:
+        col = arr[f].view(numpy.ndarray)
+        columns[f] = col.astype(object) if f in meta['strings'] else col
+    categories = {_native(f): Interner(_native(labels))
+                  for (f, labels) in meta['categories'].items()}
+
+    logger.debug("loaded {} rows of {} from cache".format(len(arr), datafile))
+    return PlayerTable(columns, fields, categories)
+
+
+def save(datafile, table, key=None):
+    """ Write table to the cache files of datafile. Every column has to be
+        numeric or all strings
+
+    """
+    arrPath, metaPath = cache_paths(datafile)
+    key = key or source_key(datafile)
+
+    dtype, strings = [], []
+    for f in table.fields:
+        col = table[f]
+        if col.dtype == object:
+            if not all(isinstance(v, str) for v in col):
+                raise ValueError("column {} has mixed types".format(f))
+            dtype.append((f, 'S{}'.format(max([len(v) for v in col] + [1]))))
+            strings.append(f)
+        else:
+            dtype.append((f, col.dtype))
+
+    arr = numpy.empty(len(table), dtype=dtype)
+    for f in table.fields:
+        arr[f] = table[f]
+
+    meta = {
+        'key': key,
+        'fields': table.fields,
+        'strings': strings,
+        'categories': {f: cat.labels for (f, cat) in table.categories.items()},
+    }
+
+    # the meta file is written last, so a cache is only ever trusted once
+    # both halves are complete
+    _atomic_write(arrPath, lambda fOut: numpy.save(fOut, arr))
+    _atomic_write(metaPath, lambda fOut: json.dump(meta, fOut))
+    logger.debug("cached {} rows of {}".format(len(arr), datafile))
+
+
+def _native(x):
+    """ json hands back unicode; the table is built out of plain strs """
+    if isinstance(x, list):
+        return [_native(v) for v in x]
+    return x.encode('utf-8') if isinstance(x, unicode) else x
+
+
+def _atomic_write(path, write):
+    """ Write through a temp file of our own next to path, so processes
+        starting up together do not clobber each other's half written files
+
+    """
+    tmp = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+    try:
+        with open(tmp, 'wb') as fOut:
+            write(fOut)
+            fOut.flush()
+            os.fsync(fOut.fileno())
+        os.rename(tmp, path)
+    except:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise